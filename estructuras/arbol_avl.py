@@ -1,12 +1,37 @@
+from bisect import bisect_left
+from typing import List
 from objetos.libro import Libro
 
 class NodoAVL:
     def __init__(self, libro: Libro):
-        self.data = libro
+        self.titulo = libro.titulo
+        # Todas las ediciones con este titulo, ordenadas por ISBN
+        self.libros: List[Libro] = [libro]
         self.izq: "NodoAVL | None" = None
         self.der: "NodoAVL | None" = None
         self.altura = 1
 
+    @property
+    def data(self) -> Libro:
+        return self.libros[0]
+
+    def _posicion(self, isbn: str) -> int:
+        return bisect_left(self.libros, isbn, key=lambda libro: libro.isbn)
+
+    def agregar(self, libro: Libro) -> None:
+        i = self._posicion(libro.isbn)
+        if i < len(self.libros) and self.libros[i].isbn == libro.isbn:
+            self.libros[i] = libro
+        else:
+            self.libros.insert(i, libro)
+
+    def quitar(self, isbn: str) -> bool:
+        i = self._posicion(isbn)
+        if i < len(self.libros) and self.libros[i].isbn == isbn:
+            del self.libros[i]
+            return True
+        return False
+
 class ArbolAVL:
     def __init__(self):
         self.raiz: NodoAVL | None = None
@@ -39,106 +64,192 @@ class ArbolAVL:
         self._actualizar_altura(y)
         return y
 
+    def _rebalancear(self, nodo: NodoAVL) -> NodoAVL:
+        """Actualiza la altura y, si hace falta, rota; retorna la nueva raiz del subarbol."""
+        self._actualizar_altura(nodo)
+        balance = self._balance(nodo)
+        if balance > 1:
+            if self._balance(nodo.izq) < 0:
+                nodo.izq = self._rotar_izquierda(nodo.izq)
+            return self._rotar_derecha(nodo)
+        if balance < -1:
+            if self._balance(nodo.der) > 0:
+                nodo.der = self._rotar_derecha(nodo.der)
+            return self._rotar_izquierda(nodo)
+        return nodo
+
+    def _subir_rebalanceando(self, camino: list, parar_si_estable: bool) -> None:
+        """
+        Recorre `camino` (pares nodo, lado por el que se bajo) desde el fondo hacia la
+        raiz, rebalanceando y reenlazando cada subarbol con su padre. Al insertar se
+        puede parar en cuanto un subarbol conserva su altura.
+        """
+        for i in range(len(camino) - 1, -1, -1):
+            nodo, _ = camino[i]
+            altura_anterior = nodo.altura
+            nuevo = self._rebalancear(nodo)
+            if nuevo is not nodo:
+                if i == 0:
+                    self.raiz = nuevo
+                elif camino[i - 1][1] == "izq":
+                    camino[i - 1][0].izq = nuevo
+                else:
+                    camino[i - 1][0].der = nuevo
+            if parar_si_estable and nuevo.altura == altura_anterior:
+                return
+
     # ---------------- Inserción ----------------
     def insertar(self, libro: Libro) -> None:
-        self.raiz = self._insertar(self.raiz, libro)
+        if not self.raiz:
+            self.raiz = NodoAVL(libro)
+            return
+        camino = []
+        actual = self.raiz
+        while True:
+            if libro.titulo < actual.titulo:
+                camino.append((actual, "izq"))
+                if not actual.izq:
+                    actual.izq = NodoAVL(libro)
+                    break
+                actual = actual.izq
+            elif libro.titulo > actual.titulo:
+                camino.append((actual, "der"))
+                if not actual.der:
+                    actual.der = NodoAVL(libro)
+                    break
+                actual = actual.der
+            else:
+                actual.agregar(libro)
+                return
+        self._subir_rebalanceando(camino, parar_si_estable=True)
 
-    def _insertar(self, nodo: NodoAVL | None, libro: Libro) -> NodoAVL:
-        if not nodo:
-            return NodoAVL(libro)
-        if libro.titulo < nodo.data.titulo:
-            nodo.izq = self._insertar(nodo.izq, libro)
-        elif libro.titulo > nodo.data.titulo:
-            nodo.der = self._insertar(nodo.der, libro)
-        else:
-            nodo.data = libro
-            return nodo
+    # ---------------- Carga masiva ----------------
+    def construir_desde_ordenados(self, libros: list) -> None:
+        """Reemplaza el arbol por uno perfectamente balanceado a partir de libros
+        ordenados por (titulo, isbn) y sin ISBN repetidos, en O(n)."""
+        grupos = []
+        for libro in libros:
+            if grupos and grupos[-1][-1].titulo == libro.titulo:
+                grupos[-1].append(libro)
+            else:
+                grupos.append([libro])
+        self.raiz = self._construir(grupos, 0, len(grupos) - 1)
 
+    def _construir(self, grupos: list, inicio: int, fin: int) -> NodoAVL | None:
+        if inicio > fin:
+            return None
+        medio = (inicio + fin) // 2
+        nodo = NodoAVL(grupos[medio][0])
+        nodo.libros = grupos[medio]
+        nodo.izq = self._construir(grupos, inicio, medio - 1)
+        nodo.der = self._construir(grupos, medio + 1, fin)
         self._actualizar_altura(nodo)
-        balance = self._balance(nodo)
-
-        if balance > 1 and libro.titulo < nodo.izq.data.titulo:
-            return self._rotar_derecha(nodo)
-        if balance < -1 and libro.titulo > nodo.der.data.titulo:
-            return self._rotar_izquierda(nodo)
-        if balance > 1 and libro.titulo > nodo.izq.data.titulo:
-            nodo.izq = self._rotar_izquierda(nodo.izq)
-            return self._rotar_derecha(nodo)
-        if balance < -1 and libro.titulo < nodo.der.data.titulo:
-            nodo.der = self._rotar_derecha(nodo.der)
-            return self._rotar_izquierda(nodo)
         return nodo
 
     # ---------------- Búsqueda ----------------
     def buscar(self, titulo: str) -> Libro | None:
+        nodo = self._buscar_nodo(titulo)
+        return nodo.data if nodo else None
+
+    def buscar_todos(self, titulo: str) -> List[Libro]:
+        """Todas las ediciones con ese titulo, ordenadas por ISBN."""
+        nodo = self._buscar_nodo(titulo)
+        return list(nodo.libros) if nodo else []
+
+    def _buscar_nodo(self, titulo: str) -> NodoAVL | None:
         actual = self.raiz
         while actual:
-            if titulo == actual.data.titulo:
-                return actual.data
-            actual = actual.izq if titulo < actual.data.titulo else actual.der
+            if titulo == actual.titulo:
+                return actual
+            actual = actual.izq if titulo < actual.titulo else actual.der
         return None
 
     # ---------------- Eliminación ----------------
-    def eliminar(self, titulo: str) -> None:
-        self.raiz = self._eliminar(self.raiz, titulo)
+    def eliminar(self, titulo: str, isbn: str | None = None) -> None:
+        """Quita la edicion `isbn` de ese titulo, o todas si no se indica ISBN."""
+        camino = []
+        actual = self.raiz
+        while actual and titulo != actual.titulo:
+            lado = "izq" if titulo < actual.titulo else "der"
+            camino.append((actual, lado))
+            actual = getattr(actual, lado)
+        if not actual:
+            return
+        if isbn is not None:
+            if not actual.quitar(isbn) or actual.libros:
+                return
 
-    def _eliminar(self, nodo: NodoAVL | None, titulo: str) -> NodoAVL | None:
-        if not nodo:
-            return None
-        if titulo < nodo.data.titulo:
-            nodo.izq = self._eliminar(nodo.izq, titulo)
-        elif titulo > nodo.data.titulo:
-            nodo.der = self._eliminar(nodo.der, titulo)
-        else:
-            if not nodo.izq or not nodo.der:
-                nodo = nodo.izq or nodo.der
-            else:
-                sucesor = self._minimo(nodo.der)
-                nodo.data = sucesor.data
-                nodo.der = self._eliminar(nodo.der, sucesor.data.titulo)
-        if not nodo:
-            return None
+        if actual.izq and actual.der:
+            # Se copia el sucesor y se elimina su nodo, que no tiene hijo izquierdo
+            camino.append((actual, "der"))
+            sucesor = actual.der
+            while sucesor.izq:
+                camino.append((sucesor, "izq"))
+                sucesor = sucesor.izq
+            actual.titulo = sucesor.titulo
+            actual.libros = sucesor.libros
+            actual = sucesor
 
-        self._actualizar_altura(nodo)
-        balance = self._balance(nodo)
+        reemplazo = actual.izq or actual.der
+        if not camino:
+            self.raiz = reemplazo
+            return
+        padre, lado = camino[-1]
+        setattr(padre, lado, reemplazo)
+        self._subir_rebalanceando(camino, parar_si_estable=False)
 
-        if balance > 1 and self._balance(nodo.izq) >= 0:
-            return self._rotar_derecha(nodo)
-        if balance > 1 and self._balance(nodo.izq) < 0:
-            nodo.izq = self._rotar_izquierda(nodo.izq)
-            return self._rotar_derecha(nodo)
-        if balance < -1 and self._balance(nodo.der) <= 0:
-            return self._rotar_izquierda(nodo)
-        if balance < -1 and self._balance(nodo.der) > 0:
-            nodo.der = self._rotar_derecha(nodo.der)
-            return self._rotar_izquierda(nodo)
-        return nodo
+    # ---------------- Recorridos y utilidades existentes ----------------
+    def __iter__(self):
+        return self.iterar()
 
-    def _minimo(self, nodo: NodoAVL) -> NodoAVL:
-        while nodo.izq:
-            nodo = nodo.izq
-        return nodo
+    def iterar(self):
+        """Libros en orden de titulo, uno a uno, con una pila del alto del arbol."""
+        return self._iterar_desde(self.raiz, None)
 
-    # ---------------- Recorridos y utilidades existentes ----------------
-    def _inorder(self, nodo):
-        if nodo:
-            self._inorder(nodo.izq)
-            print(nodo.data.titulo)
-            self._inorder(nodo.der)
+    def _iterar_desde(self, nodo, titulo_desde):
+        # La pila solo guarda los ancestros pendientes (a lo sumo la altura del arbol)
+        pila = []
+        while nodo:
+            if titulo_desde is not None and nodo.titulo < titulo_desde:
+                nodo = nodo.der
+            else:
+                pila.append(nodo)
+                nodo = nodo.izq
+        while pila:
+            nodo = pila.pop()
+            yield from nodo.libros
+            nodo = nodo.der
+            while nodo:
+                pila.append(nodo)
+                nodo = nodo.izq
+
+    def rango(self, titulo_desde: str, titulo_hasta: str):
+        """Libros con titulo_desde <= titulo <= titulo_hasta, en orden y sin armar listas."""
+        for libro in self._iterar_desde(self.raiz, titulo_desde):
+            if libro.titulo > titulo_hasta:
+                return
+            yield libro
+
+    def prefijo(self, prefijo: str):
+        """Libros cuyo titulo empieza con `prefijo`, en orden."""
+        for libro in self._iterar_desde(self.raiz, prefijo):
+            if not libro.titulo.startswith(prefijo):
+                return
+            yield libro
 
     def mostrar_inorder(self):
-        self._inorder(self.raiz)
+        for libro in self.iterar():
+            print(libro.titulo)
+
+    def listar_titulos(self):
+        if not self.raiz:
+            print("No hay libros registrados.")
+            return
+        for libro in self.iterar():
+            print(f"{libro.titulo} ({libro.isbn})")
 
     def inorder(self):
-        libros = []
-        self._recopilar_libros(self.raiz, libros)
-        return libros
-
-    def _recopilar_libros(self, nodo, libros):
-        if nodo:
-            self._recopilar_libros(nodo.izq, libros)
-            libros.append(nodo.data)
-            self._recopilar_libros(nodo.der, libros)
+        return list(self.iterar())
             
     def exportar_dot(self, archivo_dot: str) -> None:
         
@@ -159,7 +270,8 @@ class ArbolAVL:
         if not nodo:
             return
             
-        label = f"{nodo.data.titulo}\\n(h:{nodo.altura})"
+        ediciones = f" x{len(nodo.libros)}" if len(nodo.libros) > 1 else ""
+        label = f"{nodo.titulo}{ediciones}\\n(h:{nodo.altura})"
         f.write(f'    "{id(nodo)}" [label="{label}"];\n')
         
         if nodo.izq:
@@ -1,6 +1,11 @@
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from operator import attrgetter
 from objetos.libro import Libro
 from estructuras.lista_libros import ListaLibros
 
+_isbn = attrgetter("isbn")
+
 class NodoB:
     def __init__(self, t: int, hoja: bool):
         if t < 2:
@@ -20,36 +25,42 @@ class NodoB:
             self.hijos[-1].recorrer()
 
     def buscar(self, k: int):
-        i = 0
-        while i < len(self.claves) and k > self.claves[i]:
-            i += 1
-        if i < len(self.claves) and self.claves[i] == k:
-            return self
-        if self.hoja:
-            return None
-        return self.hijos[i].buscar(k)
+        nodo = self
+        while True:
+            i = bisect_left(nodo.claves, k)
+            if i < len(nodo.claves) and nodo.claves[i] == k:
+                return nodo
+            if nodo.hoja:
+                return None
+            nodo = nodo.hijos[i]
 
     def buscar_indice(self, k: int):
-        for i, clave in enumerate(self.claves):
-            if clave == k:
-                return i
-        return -1
+        i = bisect_left(self.claves, k)
+        return i if i < len(self.claves) and self.claves[i] == k else -1
+
+    def posicion(self, anio: int, isbn: str, derecha: bool = False) -> int:
+        """
+        Indice de (anio, isbn) en las claves, ordenadas por anio y luego por ISBN.
+        Con derecha=True queda despues de las entradas iguales.
+        """
+        # Primero por anio sobre las claves; el ISBN solo desempata dentro del mismo anio
+        inicio = bisect_left(self.claves, anio)
+        fin = bisect_right(self.claves, anio, inicio)
+        if inicio == fin:
+            return inicio
+        if derecha:
+            return bisect_right(self.valores, isbn, inicio, fin, key=_isbn)
+        return bisect_left(self.valores, isbn, inicio, fin, key=_isbn)
 
     def insertar_no_lleno(self, libro: Libro):
-        i = len(self.claves) - 1
+        i = self.posicion(libro.anio, libro.isbn, derecha=True)
         if self.hoja:
-            # Insertar en hoja
-            while i >= 0 and self.claves[i] > libro.anio:
-                i -= 1
-            self.claves.insert(i + 1, libro.anio)
-            self.valores.insert(i + 1, libro)
+            self.claves.insert(i, libro.anio)
+            self.valores.insert(i, libro)
         else:
-            while i >= 0 and self.claves[i] > libro.anio:
-                i -= 1
-            i += 1
             if len(self.hijos[i].claves) == (2 * self.t - 1):
                 self.dividir_hijo(i, self.hijos[i])
-                if self.claves[i] < libro.anio:
+                if (self.claves[i], self.valores[i].isbn) <= (libro.anio, libro.isbn):
                     i += 1
             self.hijos[i].insertar_no_lleno(libro)
 
@@ -57,6 +68,10 @@ class NodoB:
         t = self.t
         z = NodoB(t, y.hoja)
 
+        # La clave del medio sube a este nodo
+        clave_media = y.claves[t - 1]
+        valor_medio = y.valores[t - 1]
+
         # Copiar la mitad derecha a z
         z.claves = y.claves[t:]
         z.valores = y.valores[t:]
@@ -70,25 +85,8 @@ class NodoB:
 
         # Insertar nuevo hijo en este nodo
         self.hijos.insert(i + 1, z)
-        self.claves.insert(i, y.claves.pop())
-        self.valores.insert(i, y.valores.pop())
-
-    def buscar_rango(self, inicio, fin, lista: ListaLibros):
-        i = 0
-        while i < len(self.claves) and self.claves[i] < inicio:
-            if not self.hoja:
-                self.hijos[i].buscar_rango(inicio, fin, lista)
-            i += 1
-
-        while i < len(self.claves) and self.claves[i] <= fin:
-            if not self.hoja:
-                self.hijos[i].buscar_rango(inicio, fin, lista)
-            if inicio <= self.claves[i] <= fin:
-                lista.insertar(self.valores[i])
-            i += 1
-
-        if not self.hoja and i < len(self.hijos):
-            self.hijos[i].buscar_rango(inicio, fin, lista)
+        self.claves.insert(i, clave_media)
+        self.valores.insert(i, valor_medio)
 
 
 class ArbolB:
@@ -107,7 +105,7 @@ class ArbolB:
                 s.hijos.append(self.raiz)
                 s.dividir_hijo(0, self.raiz)
                 i = 0
-                if s.claves[0] < libro.anio:
+                if (s.claves[0], s.valores[0].isbn) <= (libro.anio, libro.isbn):
                     i += 1
                 s.hijos[i].insertar_no_lleno(libro)
                 self.raiz = s
@@ -118,6 +116,67 @@ class ArbolB:
         if self.raiz:
             self.raiz.recorrer()
 
+    def inorder(self):
+        libros = []
+        self._recopilar_libros(self.raiz, libros)
+        return libros
+
+    def _recopilar_libros(self, nodo, libros):
+        if not nodo:
+            return
+        for i in range(len(nodo.claves)):
+            if not nodo.hoja:
+                self._recopilar_libros(nodo.hijos[i], libros)
+            libros.append(nodo.valores[i])
+        if not nodo.hoja:
+            self._recopilar_libros(nodo.hijos[-1], libros)
+
+    # -------------------------------------------------
+    # Carga masiva
+    # -------------------------------------------------
+    def construir_desde_ordenados(self, libros):
+        """
+        Reemplaza el arbol construyendolo de abajo hacia arriba a partir de libros
+        ordenados por (anio, isbn), en O(n). Cada nodo que no es raiz queda con entre t-1 y
+        2t-1 claves y todas las hojas a la misma profundidad.
+        """
+        n = len(libros)
+        if n == 0:
+            self.raiz = None
+            return
+        altura = 0
+        while n > self._capacidad_subarbol(altura):
+            altura += 1
+        self.raiz = self._construir(libros, 0, n, altura, 2)
+
+    def _capacidad_subarbol(self, altura: int) -> int:
+        return (2 * self.t) ** (altura + 1) - 1
+
+    def _construir(self, libros, inicio: int, fin: int, altura: int, minimo_hijos: int):
+        nodo = NodoB(self.t, altura == 0)
+        if altura == 0:
+            nodo.valores = libros[inicio:fin]
+            nodo.claves = [libro.anio for libro in nodo.valores]
+            return nodo
+
+        # Los menos hijos posibles sin pasar la capacidad de cada subarbol, y al
+        # menos t para que los hijos tampoco queden por debajo del minimo
+        n = fin - inicio
+        capacidad_hijo = self._capacidad_subarbol(altura - 1)
+        cantidad_hijos = max(minimo_hijos, -(-(n + 1) // (capacidad_hijo + 1)))
+        por_hijo, sobrantes = divmod(n - cantidad_hijos + 1, cantidad_hijos)
+
+        posicion = inicio
+        for i in range(cantidad_hijos):
+            tamanio = por_hijo + (1 if i < sobrantes else 0)
+            nodo.hijos.append(self._construir(libros, posicion, posicion + tamanio, altura - 1, self.t))
+            posicion += tamanio
+            if i < cantidad_hijos - 1:
+                nodo.claves.append(libros[posicion].anio)
+                nodo.valores.append(libros[posicion])
+                posicion += 1
+        return nodo
+
     def buscar(self, k: int):
         if not self.raiz:
             return None
@@ -128,11 +187,74 @@ class ArbolB:
         return nodo.valores[indice] if indice >= 0 else None
 
     def buscar_por_rango_fechas(self, inicio, fin):
+        # ListaLibros inserta al frente: se carga al reves para que quede en orden
         lista = ListaLibros()
-        if self.raiz:
-            self.raiz.buscar_rango(inicio, fin, lista)
+        for libro in reversed(list(self.rango(inicio, fin))):
+            lista.insertar(libro)
         return lista
 
+    # -------------------------------------------------
+    # Cursor por rango de anios
+    # -------------------------------------------------
+    def rango(self, inicio: int, fin: int, limite: int = None, desplazamiento: int = 0):
+        """
+        Libros con inicio <= anio <= fin en orden (anio, isbn), generados de a uno.
+        `desplazamiento` salta los primeros resultados y `limite` corta despues de
+        esa cantidad, para paginar sin armar la lista completa.
+        """
+        libros = self._rango(inicio, fin)
+        if desplazamiento or limite is not None:
+            tope = None if limite is None else desplazamiento + limite
+            libros = islice(libros, desplazamiento, tope)
+        return libros
+
+    def _rango(self, inicio: int, fin: int):
+        # Cada entrada de la pila es (nodo, i): falta emitir la clave i y lo que sigue.
+        # Se baja solo por el hijo que puede contener `inicio`
+        pila = []
+        nodo = self.raiz
+        while nodo:
+            i = bisect_left(nodo.claves, inicio)
+            pila.append((nodo, i))
+            nodo = None if nodo.hoja else nodo.hijos[i]
+        while pila:
+            nodo, i = pila.pop()
+            if i >= len(nodo.claves):
+                continue
+            if nodo.claves[i] > fin:
+                return
+            yield nodo.valores[i]
+            pila.append((nodo, i + 1))
+            if not nodo.hoja:
+                hijo = nodo.hijos[i + 1]
+                while hijo:
+                    pila.append((hijo, 0))
+                    hijo = None if hijo.hoja else hijo.hijos[0]
+
+    def contar_rango(self, inicio: int, fin: int) -> int:
+        """
+        Cantidad de libros con inicio <= anio <= fin sin generarlos: en cada nodo
+        las claves del rango se cuentan con bisect y solo los dos hijos de los
+        bordes se revisan clave por clave.
+        """
+        total = 0
+        pendientes = [(self.raiz, True)] if self.raiz else []
+        while pendientes:
+            nodo, parcial = pendientes.pop()
+            if not parcial:
+                # Subarbol completamente dentro del rango
+                total += len(nodo.claves)
+                pendientes.extend((hijo, False) for hijo in nodo.hijos)
+                continue
+            desde = bisect_left(nodo.claves, inicio)
+            hasta = bisect_right(nodo.claves, fin)
+            total += max(0, hasta - desde)
+            if nodo.hoja:
+                continue
+            for i in range(desde, max(desde, hasta) + 1):
+                pendientes.append((nodo.hijos[i], i == desde or i == hasta))
+        return total
+
     def exportar_dot(self, archivo: str):
         with open(archivo, "w", encoding="utf-8") as out:
             out.write("digraph BTree {\n")
@@ -184,26 +306,100 @@ class ArbolB:
         if not nodo.hoja:
             self._listar_anios_rec(nodo.hijos[-1], conteo)
 
-    def eliminar(self, anio, isbn):
+    # -------------------------------------------------
+    # Eliminación
+    # -------------------------------------------------
+    def eliminar(self, anio, isbn) -> bool:
+        """
+        Elimina la entrada (anio, isbn) bajando por un solo camino. Antes de entrar a
+        un hijo con el minimo de claves se le presta una clave de un hermano o se lo
+        fusiona con uno, asi ningun nodo queda por debajo de t-1 claves.
+        """
         if not self.raiz:
             return False
-        self._eliminar_rec(self.raiz, anio, isbn)
-        return True
+        eliminado = self._eliminar(self.raiz, anio, isbn)
+        # La raiz puede quedar vacia tras una fusion: el arbol pierde un nivel
+        if not self.raiz.claves:
+            self.raiz = None if self.raiz.hoja else self.raiz.hijos[0]
+        return eliminado
 
-    def _eliminar_rec(self, nodo, anio, isbn):
-        if not nodo:
-            return
-        i = 0
-        while i < len(nodo.claves):
-            if not nodo.hoja:
-                self._eliminar_rec(nodo.hijos[i], anio, isbn)
-            if nodo.claves[i] == anio and nodo.valores[i].isbn == isbn:
-                del nodo.claves[i]
-                del nodo.valores[i]
-                return
-            i += 1
-        if not nodo.hoja:
-            self._eliminar_rec(nodo.hijos[-1], anio, isbn)
+    def _eliminar(self, nodo, anio, isbn) -> bool:
+        t = self.t
+        while True:
+            i = nodo.posicion(anio, isbn)
+            encontrado = (i < len(nodo.claves) and nodo.claves[i] == anio
+                          and nodo.valores[i].isbn == isbn)
+            if nodo.hoja:
+                if encontrado:
+                    del nodo.claves[i]
+                    del nodo.valores[i]
+                return encontrado
+
+            if encontrado:
+                izquierdo, derecho = nodo.hijos[i], nodo.hijos[i + 1]
+                if len(izquierdo.claves) >= t:
+                    # Se reemplaza por el predecesor y se elimina este en el hijo
+                    clave, libro = self._extremo(izquierdo, ultimo=True)
+                    nodo.claves[i], nodo.valores[i] = clave, libro
+                    nodo, anio, isbn = izquierdo, clave, libro.isbn
+                elif len(derecho.claves) >= t:
+                    clave, libro = self._extremo(derecho, ultimo=False)
+                    nodo.claves[i], nodo.valores[i] = clave, libro
+                    nodo, anio, isbn = derecho, clave, libro.isbn
+                else:
+                    self._fusionar(nodo, i)
+                    nodo = izquierdo
+                continue
+
+            if len(nodo.hijos[i].claves) < t:
+                i = self._reforzar_hijo(nodo, i)
+            nodo = nodo.hijos[i]
+
+    def _extremo(self, nodo, ultimo: bool):
+        """(clave, libro) de la primera o la ultima entrada del subarbol."""
+        while not nodo.hoja:
+            nodo = nodo.hijos[-1 if ultimo else 0]
+        indice = -1 if ultimo else 0
+        return nodo.claves[indice], nodo.valores[indice]
+
+    def _reforzar_hijo(self, nodo, i: int) -> int:
+        """Deja al hijo i con al menos t claves; retorna el indice por el que seguir."""
+        hijo = nodo.hijos[i]
+        if i > 0 and len(nodo.hijos[i - 1].claves) >= self.t:
+            # Rotacion desde el hermano izquierdo
+            hermano = nodo.hijos[i - 1]
+            hijo.claves.insert(0, nodo.claves[i - 1])
+            hijo.valores.insert(0, nodo.valores[i - 1])
+            nodo.claves[i - 1] = hermano.claves.pop()
+            nodo.valores[i - 1] = hermano.valores.pop()
+            if not hermano.hoja:
+                hijo.hijos.insert(0, hermano.hijos.pop())
+            return i
+        if i < len(nodo.hijos) - 1 and len(nodo.hijos[i + 1].claves) >= self.t:
+            # Rotacion desde el hermano derecho
+            hermano = nodo.hijos[i + 1]
+            hijo.claves.append(nodo.claves[i])
+            hijo.valores.append(nodo.valores[i])
+            nodo.claves[i] = hermano.claves.pop(0)
+            nodo.valores[i] = hermano.valores.pop(0)
+            if not hermano.hoja:
+                hijo.hijos.append(hermano.hijos.pop(0))
+            return i
+        if i < len(nodo.hijos) - 1:
+            self._fusionar(nodo, i)
+            return i
+        self._fusionar(nodo, i - 1)
+        return i - 1
+
+    def _fusionar(self, nodo, i: int) -> None:
+        """Une el hijo i, la clave i y el hijo i+1 en el hijo i."""
+        izquierdo = nodo.hijos[i]
+        derecho = nodo.hijos.pop(i + 1)
+        izquierdo.claves.append(nodo.claves.pop(i))
+        izquierdo.valores.append(nodo.valores.pop(i))
+        izquierdo.claves.extend(derecho.claves)
+        izquierdo.valores.extend(derecho.valores)
+        izquierdo.hijos.extend(derecho.hijos)
 
     def buscar_todos(self, k: int):
         resultados = []
@@ -212,12 +408,11 @@ class ArbolB:
         return resultados
 
     def _buscar_todos_rec(self, nodo, k: int, resultados):
-        if not nodo:
-            return
-        for i in range(len(nodo.claves)):
+        # Solo los hijos entre la primera y la ultima clave igual a k pueden tener k
+        inicio = bisect_left(nodo.claves, k)
+        fin = bisect_right(nodo.claves, k)
+        for i in range(inicio, fin + 1):
             if not nodo.hoja:
                 self._buscar_todos_rec(nodo.hijos[i], k, resultados)
-            if nodo.claves[i] == k:
+            if i < fin:
                 resultados.append(nodo.valores[i])
-        if not nodo.hoja:
-            self._buscar_todos_rec(nodo.hijos[-1], k, resultados)
\ No newline at end of file
@@ -1,5 +1,7 @@
-from typing import List, Dict, Optional
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
 from objetos.libro import Libro
+from estructuras.diccionario_categorias import CATEGORIAS
 
 
 class NodoBPlus:
@@ -7,15 +9,47 @@ class NodoBPlus:
         self.hoja: bool = hoja
         self.claves: List[str] = []
         self.hijos: List['NodoBPlus'] = []
-        self.valores: List[List[Libro]] = []
+        # Libros de cada genero por ISBN: el dict conserva el orden de insercion
+        # y resuelve pertenencia y borrado en O(1) aunque el genero sea enorme
+        self.valores: List[Dict[str, Libro]] = []
         self.siguiente: Optional['NodoBPlus'] = None
 
+    def __getstate__(self):
+        # El enlace entre hojas no se serializa (pickle lo seguiria hoja por hoja);
+        # ArbolBPlus lo reconstruye al cargar
+        estado = self.__dict__.copy()
+        estado["siguiente"] = None
+        return estado
+
+    def __setstate__(self, estado):
+        # Las claves que llegan de otro proceso se reemplazan por los generos canonicos
+        estado["claves"] = [CATEGORIAS.canonico(clave) for clave in estado["claves"]]
+        self.__dict__.update(estado)
+
 
 class ArbolBPlus:
     def __init__(self, t: int = 2):
         self.t = max(2, t)
         self.raiz = NodoBPlus(True)
 
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._enlazar_hojas()
+
+    def _enlazar_hojas(self):
+        anterior = None
+        pendientes = [self.raiz]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo.hoja:
+                if anterior:
+                    anterior.siguiente = nodo
+                anterior = nodo
+            else:
+                pendientes.extend(reversed(nodo.hijos))
+        if anterior:
+            anterior.siguiente = None
+
     # -------------------------------------------------
     # Inserción
     # -------------------------------------------------
@@ -29,23 +63,17 @@ class ArbolBPlus:
 
     def _insertar_interno(self, nodo: NodoBPlus, libro: Libro, genero: str):
         if nodo.hoja:
-            for i, clave in enumerate(nodo.claves):
-                if clave == genero:
-                    if not any(l.isbn == libro.isbn for l in nodo.valores[i]):
-                        nodo.valores[i].append(libro)
-                    return
-
-            nodo.claves.append(genero)
-            nodo.valores.append([libro])
-
-            for i in range(len(nodo.claves) - 1, 0, -1):
-                if nodo.claves[i] < nodo.claves[i - 1]:
-                    nodo.claves[i], nodo.claves[i - 1] = nodo.claves[i - 1], nodo.claves[i]
-                    nodo.valores[i], nodo.valores[i - 1] = nodo.valores[i - 1], nodo.valores[i]
+            i = bisect_left(nodo.claves, genero)
+            if i < len(nodo.claves) and nodo.claves[i] == genero:
+                nodo.valores[i].setdefault(libro.isbn, libro)
+                return
+
+            nodo.claves.insert(i, genero)
+            nodo.valores.insert(i, {libro.isbn: libro})
         else:
-            i = 0
-            while i < len(nodo.claves) and genero > nodo.claves[i]:
-                i += 1
+            # El separador es la menor clave de su derecha: un genero igual baja a la
+            # derecha, a la hoja que ya lo tiene, y no se duplica en la de la izquierda
+            i = bisect_right(nodo.claves, genero)
             self._insertar_interno(nodo.hijos[i], libro, genero)
 
             if len(nodo.hijos[i].claves) >= 2 * self.t:
@@ -78,50 +106,156 @@ class ArbolBPlus:
             padre.hijos.insert(i + 1, nuevo)
 
     # -------------------------------------------------
-    # Búsqueda
+    # Carga masiva
     # -------------------------------------------------
-    def buscar(self, genero: str) -> List[Libro]:
-        resultado: List[Libro] = []
-        if not self.raiz:
-            return resultado
+    def construir_desde_ordenados(self, grupos: List[Tuple[str, Iterable[Libro]]]):
+        """
+        Reemplaza el arbol construyendolo de abajo hacia arriba a partir de pares
+        (genero, libros) ordenados por genero y sin generos repetidos, en O(n):
+        primero las hojas enlazadas y luego cada nivel interno.
+        """
+        self.raiz = NodoBPlus(True)
+        if not grupos:
+            return
 
+        hojas = []
+        anterior = None
+        for tramo in self._repartir(grupos, 2 * self.t - 1):
+            hoja = NodoBPlus(True)
+            hoja.claves = [genero for genero, _ in tramo]
+            hoja.valores = [self._nuevo_grupo(libros) for _, libros in tramo]
+            if anterior:
+                anterior.siguiente = hoja
+            anterior = hoja
+            hojas.append((hoja, hoja.claves[0]))
+
+        # Cada separador es la menor clave del subarbol a su derecha, como en _dividir_nodo
+        nivel = hojas
+        while len(nivel) > 1:
+            superior = []
+            for tramo in self._repartir(nivel, 2 * self.t):
+                nodo = NodoBPlus(False)
+                nodo.hijos = [hijo for hijo, _ in tramo]
+                nodo.claves = [minima for _, minima in tramo[1:]]
+                superior.append((nodo, tramo[0][1]))
+            nivel = superior
+        self.raiz = nivel[0][0]
+
+    def _nuevo_grupo(self, libros) -> Dict[str, Libro]:
+        """Grupo isbn -> libro a partir de otro grupo o de libros sueltos (gana el primero)."""
+        if isinstance(libros, dict):
+            return dict(libros)
+        grupo: Dict[str, Libro] = {}
+        for libro in libros:
+            grupo.setdefault(libro.isbn, libro)
+        return grupo
+
+    def _repartir(self, elementos: list, maximo: int) -> List[list]:
+        """Divide en la menor cantidad de tramos de a lo sumo `maximo`, con tamanios parejos."""
+        cantidad = -(-len(elementos) // maximo)
+        por_tramo, sobrantes = divmod(len(elementos), cantidad)
+        tramos = []
+        posicion = 0
+        for i in range(cantidad):
+            tamanio = por_tramo + (1 if i < sobrantes else 0)
+            tramos.append(elementos[posicion:posicion + tamanio])
+            posicion += tamanio
+        return tramos
+
+    def obtener_grupos(self) -> Dict[str, Dict[str, Libro]]:
+        """Libros por genero (isbn -> libro, en orden) recorriendo las hojas enlazadas."""
+        grupos: Dict[str, Dict[str, Libro]] = {}
         actual = self.raiz
         while not actual.hoja:
-            i = 0
-            while i < len(actual.claves) and genero > actual.claves[i]:
-                i += 1
-            actual = actual.hijos[i]
-
+            actual = actual.hijos[0]
         while actual:
             for i, clave in enumerate(actual.claves):
-                if clave == genero:
-                    resultado.extend(actual.valores[i])
+                grupo = grupos.setdefault(clave, {})
+                for isbn, libro in actual.valores[i].items():
+                    grupo.setdefault(isbn, libro)
+            actual = actual.siguiente
+        return grupos
+
+    # -------------------------------------------------
+    # Búsqueda
+    # -------------------------------------------------
+    def _hoja_desde(self, genero: str) -> NodoBPlus:
+        """
+        Hoja donde esta (o iria) `genero`: se baja igual que al insertar, asi que un
+        genero igual a un separador cae directo en la hoja que lo tiene. Las hojas
+        anteriores solo tienen claves menores.
+        """
+        actual = self.raiz
+        while not actual.hoja:
+            actual = actual.hijos[bisect_right(actual.claves, genero)]
+        return actual
+
+    def _grupos_desde(self, genero: str):
+        """Pares (genero, libros) con clave >= genero, en orden por la cadena de hojas."""
+        actual = self._hoja_desde(genero)
+        i = bisect_left(actual.claves, genero)
+        while actual:
+            for j in range(i, len(actual.claves)):
+                yield actual.claves[j], actual.valores[j]
             actual = actual.siguiente
+            i = 0
 
+    def buscar(self, genero: str) -> List[Libro]:
+        resultado: List[Libro] = []
+        if not self.raiz:
+            return resultado
+        # Con el canonico, las claves iguales se reconocen por identidad
+        genero = CATEGORIAS.consultar(genero)
+
+        # Se corta en la primera clave mayor: solo se tocan las hojas del genero
+        for clave, libros in self._grupos_desde(genero):
+            if clave != genero:
+                break
+            resultado.extend(libros.values())
         return resultado
 
+    def rango(self, genero_desde: str, genero_hasta: str):
+        """Libros con genero_desde <= genero <= genero_hasta, en orden de genero y sin armar listas."""
+        if not self.raiz:
+            return
+        for clave, libros in self._grupos_desde(genero_desde):
+            if clave > genero_hasta:
+                return
+            yield from libros.values()
+
+    def prefijo(self, prefijo: str):
+        """Libros cuyo genero empieza con `prefijo`, en orden de genero."""
+        if not self.raiz:
+            return
+        for clave, libros in self._grupos_desde(prefijo):
+            if not clave.startswith(prefijo):
+                return
+            yield from libros.values()
+
     # -------------------------------------------------
     # Eliminación
     # -------------------------------------------------
     def eliminar(self, genero: str, isbn: str) -> bool:
         if not self.raiz:
             return False
+        genero = CATEGORIAS.consultar(genero)
 
-        actual = self.raiz
-        while not actual.hoja:
-            actual = actual.hijos[0]
-
+        actual = self._hoja_desde(genero)
+        i = bisect_left(actual.claves, genero)
         while actual:
-            for i, clave in enumerate(actual.claves):
-                if clave == genero:
-                    for j, l in enumerate(actual.valores[i]):
-                        if l.isbn == isbn:
-                            del actual.valores[i][j]
-                            if not actual.valores[i]:
-                                del actual.valores[i]
-                                del actual.claves[i]
-                            return True
-            actual = actual.siguiente
+            if i < len(actual.claves):
+                if actual.claves[i] != genero:
+                    return False
+                libros = actual.valores[i]
+                if libros.pop(isbn, None) is not None:
+                    if not libros:
+                        del actual.valores[i]
+                        del actual.claves[i]
+                    return True
+                i += 1
+            else:
+                actual = actual.siguiente
+                i = 0
         return False
 
     # -------------------------------------------------
@@ -147,7 +281,7 @@ class ArbolBPlus:
                 print(f"{'TITULO':<30}{'AUTOR':<25}{'AÑO':<8}{'ISBN'}")
                 print("=" * 80)
 
-                for l in libros:
+                for l in libros.values():
                     print(f"{l.titulo:<30}{l.autor:<25}{l.anio:<8}{l.isbn}")
 
                 print("=" * 80)
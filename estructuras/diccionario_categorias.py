@@ -0,0 +1,43 @@
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class DiccionarioCategorias:
+    """
+    Tabla de internado para valores categoricos (genero, estado, prioridad,
+    bibliotecas): cada valor distinto se guarda una sola vez. Quien guarda el
+    valor canonico en lugar de su propia copia comparte memoria, y las
+    comparaciones por igualdad entre canonicos se resuelven por identidad sin
+    recorrer los caracteres.
+    """
+
+    def __init__(self):
+        self._canonicos: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._canonicos)
+
+    def canonico(self, valor: str) -> str:
+        """Canonico de `valor`, registrandolo si es nuevo (para valores que se guardan)."""
+        return self._canonicos.setdefault(valor, valor)
+
+    def consultar(self, valor: str) -> str:
+        """Canonico de `valor` sin registrarlo: para busquedas y borrados, que no guardan nada."""
+        return self._canonicos.get(valor, valor)
+
+    def canonicos(self, valores: Iterable[str], normalizar: Optional[Callable[[str], str]] = None) -> List[str]:
+        """
+        Canonicos de una columna completa. `normalizar` se aplica una vez por valor
+        distinto de la columna, no una vez por fila.
+        """
+        vistos: Dict[str, str] = {}
+        resultado = []
+        for valor in valores:
+            canonico = vistos.get(valor)
+            if canonico is None:
+                canonico = vistos[valor] = self.canonico(normalizar(valor) if normalizar else valor)
+            resultado.append(canonico)
+        return resultado
+
+
+# Tabla compartida por Libro, los arboles, el inventario y la carga de CSV
+CATEGORIAS = DiccionarioCategorias()
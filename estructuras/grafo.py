@@ -1,7 +1,13 @@
 from typing import Dict, List, Tuple, Optional
+import heapq
 import math
 
+from estructuras.grafo_csr import GrafoCSR
+
 class Arista:
+    # Sin __dict__ por instancia: una red de 100k+ conexiones guarda una Arista por cada una
+    __slots__ = ("destino", "tiempo", "costo")
+
     def __init__(self, destino: str, tiempo: int, costo: float):
         self.destino = destino
         self.tiempo = tiempo
@@ -11,50 +17,105 @@ class Grafo:
     def __init__(self):
         self.nodos: Dict[str, List[Arista]] = {}
         self.etiquetas: Dict[str, str] = {}
+        # Indice inverso destino -> {origen: cantidad de aristas} y arista por par (origen, destino)
+        self.entrantes: Dict[str, Dict[str, int]] = {}
+        self._aristas: Dict[Tuple[str, str], Arista] = {}
+        self._grado_entrada: Dict[str, int] = {}
+        # Se incrementa con cada cambio de conexiones para que los indices externos detecten cambios
+        self.version = 0
+        # Arboles de caminos minimos por (origen, usar_tiempo); se descartan al cambiar la red
+        self._arboles: Dict[Tuple[str, bool], Tuple[Dict[str, float], Dict[str, Optional[str]]]] = {}
+        # Origenes ya consultados: a partir de la segunda consulta conviene guardar su arbol
+        self._origenes_consultados = set()
+        # Copia compacta (CSR) usada por las consultas; se compila bajo demanda
+        self._csr: Optional[GrafoCSR] = None
+        # Coordenadas opcionales de cada nodo y datos precalculados para las heuristicas de A*
+        self.coordenadas: Dict[str, Tuple[float, float]] = {}
+        self.cantidad_landmarks = 4
+        self._heuristicas: Dict[Tuple[str, Optional[bool]], object] = {}
+
+    def _invalidar_cache(self) -> None:
+        self.version += 1
+        self._arboles.clear()
+        self._origenes_consultados.clear()
+        self._csr = None
+        self._heuristicas.clear()
+
+    def obtener_csr(self) -> GrafoCSR:
+        if self._csr is None:
+            self._csr = GrafoCSR(self.nodos, self.version)
+        return self._csr
 
     def agregar_nodo(self, nombre: str, etiqueta: str = None):
         if nombre not in self.nodos:
             self.nodos[nombre] = []
+            self.entrantes[nombre] = {}
+            self._grado_entrada[nombre] = 0
+            self._csr = None
+            self._heuristicas.clear()
         if etiqueta:
             self.etiquetas[nombre] = etiqueta
 
     def agregar_arista(self, origen: str, destino: str, tiempo: int, costo: float, bidireccional: bool = True):
+        # Los tiempos son enteros (asi se guardan en el CSR y se reportan las rutas)
+        if tiempo != int(tiempo):
+            raise ValueError(f"El tiempo de una conexion debe ser entero, recibido: {tiempo}")
+        tiempo = int(tiempo)
         self.agregar_nodo(origen)
         self.agregar_nodo(destino)
-        self.nodos[origen].append(Arista(destino, tiempo, costo))
+        self._enlazar(origen, destino, tiempo, costo)
         if bidireccional:
-            self.nodos[destino].append(Arista(origen, tiempo, costo))
+            self._enlazar(destino, origen, tiempo, costo)
+        self._invalidar_cache()
+
+    def _enlazar(self, origen: str, destino: str, tiempo: int, costo: float) -> None:
+        arista = Arista(destino, tiempo, costo)
+        self.nodos[origen].append(arista)
+        self._aristas.setdefault((origen, destino), arista)
+        entrantes = self.entrantes[destino]
+        entrantes[origen] = entrantes.get(origen, 0) + 1
+        self._grado_entrada[destino] += 1
+
+    def _desenlazar(self, origen: str, destino: str) -> int:
+        if (origen, destino) not in self._aristas:
+            return 0
+        del self._aristas[(origen, destino)]
+        cantidad = self.entrantes[destino].pop(origen)
+        self._grado_entrada[destino] -= cantidad
+        self.nodos[origen] = [a for a in self.nodos[origen] if a.destino != destino]
+        return cantidad
 
     def eliminar_nodo(self, nombre: str) -> bool:
         if nombre not in self.nodos:
             return False
         
+        for origen in list(self.entrantes[nombre]):
+            self._desenlazar(origen, nombre)
+        for destino in {arista.destino for arista in self.nodos[nombre]}:
+            self._desenlazar(nombre, destino)
+        
         del self.nodos[nombre]
+        del self.entrantes[nombre]
+        del self._grado_entrada[nombre]
+        self.coordenadas.pop(nombre, None)
+        self._invalidar_cache()
         
         if nombre in self.etiquetas:
             del self.etiquetas[nombre]
         
-        for nodo_origen in self.nodos:
-            self.nodos[nodo_origen] = [
-                arista for arista in self.nodos[nodo_origen]
-                if arista.destino != nombre
-            ]
-        
         return True
 
     def eliminar_arista(self, origen: str, destino: str, bidireccional: bool = True) -> bool:
         if origen not in self.nodos:
             return False
         
-        aristas_origen = self.nodos[origen]
-        cantidad_inicial = len(aristas_origen)
-        self.nodos[origen] = [a for a in aristas_origen if a.destino != destino]
+        self._invalidar_cache()
+        eliminadas = self._desenlazar(origen, destino)
         
         if bidireccional and destino in self.nodos:
-            aristas_destino = self.nodos[destino]
-            self.nodos[destino] = [a for a in aristas_destino if a.destino != origen]
+            self._desenlazar(destino, origen)
         
-        return len(self.nodos[origen]) < cantidad_inicial
+        return eliminadas > 0
 
     def dijkstra_tiempo(self, origen: str, destino: str) -> Tuple[int, List[str]]:
         distancia, ruta = self._dijkstra(origen, destino, usar_tiempo=True)
@@ -67,153 +128,462 @@ class Grafo:
         if origen not in self.nodos or destino not in self.nodos:
             return (math.inf, [])
 
-        distancias: Dict[str, float] = {nodo: math.inf for nodo in self.nodos}
-        previos: Dict[str, Optional[str]] = {nodo: None for nodo in self.nodos}
-        distancias[origen] = 0.0
-        visitados = set()
+        # La primera consulta desde un origen usa busqueda bidireccional; si el origen
+        # se repite se calcula su arbol completo y las siguientes solo lo leen.
+        clave = (origen, usar_tiempo)
+        if clave not in self._arboles and clave not in self._origenes_consultados:
+            self._origenes_consultados.add(clave)
+            return self._dijkstra_bidireccional(origen, destino, usar_tiempo)
 
-        while len(visitados) < len(self.nodos):
-            nodo_actual = None
-            distancia_minima = math.inf
-
-            for nodo in self.nodos:
-                if nodo not in visitados and distancias[nodo] < distancia_minima:
-                    distancia_minima = distancias[nodo]
-                    nodo_actual = nodo
+        distancias, previos = self.obtener_arbol_caminos(origen, usar_tiempo)
+        if destino not in distancias:
+            return (math.inf, [])
 
-            if nodo_actual is None or nodo_actual == destino:
+        return (distancias[destino], self._reconstruir_camino(previos, destino))
+
+    def _dijkstra_bidireccional(self, origen: str, destino: str, usar_tiempo: bool) -> Tuple[float, List[str]]:
+        csr = self.obtener_csr()
+        id_origen, id_destino = csr.ids[origen], csr.ids[destino]
+        if id_origen == id_destino:
+            return (0.0, [origen])
+
+        pesos = csr.pesos(usar_tiempo)
+        # Lado 0 avanza sobre la adyacencia normal desde el origen, lado 1 sobre la inversa desde el destino
+        adyacencias = (
+            (csr.inicio, csr.destinos, None),
+            (csr.inicio_inv, csr.origenes_inv, csr.aristas_inv),
+        )
+        distancias: Tuple[Dict[int, float], Dict[int, float]] = ({id_origen: 0.0}, {id_destino: 0.0})
+        previos: Tuple[Dict[int, int], Dict[int, int]] = ({id_origen: -1}, {id_destino: -1})
+        cerrados = (set(), set())
+        monticulos: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([(0.0, id_origen)], [(0.0, id_destino)])
+        mejor = math.inf
+        encuentro = -1
+
+        while monticulos[0] and monticulos[1]:
+            if monticulos[0][0][0] + monticulos[1][0][0] >= mejor:
                 break
+            lado = 0 if monticulos[0][0][0] <= monticulos[1][0][0] else 1
+            distancia_actual, nodo_actual = heapq.heappop(monticulos[lado])
+            if nodo_actual in cerrados[lado]:
+                continue
+            cerrados[lado].add(nodo_actual)
+
+            inicio, vecinos, aristas = adyacencias[lado]
+            propias, otras, propios_previos = distancias[lado], distancias[1 - lado], previos[lado]
+            for r in range(inicio[nodo_actual], inicio[nodo_actual + 1]):
+                vecino = vecinos[r]
+                distancia = distancia_actual + pesos[aristas[r] if aristas else r]
+                if distancia < propias.get(vecino, math.inf):
+                    propias[vecino] = distancia
+                    propios_previos[vecino] = nodo_actual
+                    heapq.heappush(monticulos[lado], (distancia, vecino))
+                if vecino in otras and propias[vecino] + otras[vecino] < mejor:
+                    mejor = propias[vecino] + otras[vecino]
+                    encuentro = vecino
+
+        if encuentro < 0:
+            return (math.inf, [])
 
-            visitados.add(nodo_actual)
-
-            for arista in self.nodos[nodo_actual]:
-                peso = arista.tiempo if usar_tiempo else arista.costo
-                distancia = distancias[nodo_actual] + peso
-
-                if distancia < distancias[arista.destino]:
-                    distancias[arista.destino] = distancia
-                    previos[arista.destino] = nodo_actual
-
-        # Reconstruir el camino
+        camino: List[str] = []
+        nodo = encuentro
+        while nodo >= 0:
+            camino.append(csr.nombres[nodo])
+            nodo = previos[0][nodo]
+        camino.reverse()
+        nodo = previos[1][encuentro]
+        while nodo >= 0:
+            camino.append(csr.nombres[nodo])
+            nodo = previos[1][nodo]
+        return (mejor, camino)
+
+    def obtener_arbol_caminos(self, origen: str, usar_tiempo: bool = True) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+        """
+        Retorna el arbol de caminos minimos desde origen como (distancias, previos).
+        Solo incluye los nodos alcanzables. El arbol se guarda hasta que la red cambie.
+        """
+        clave = (origen, usar_tiempo)
+        arbol = self._arboles.get(clave)
+        if arbol is None:
+            arbol = self._calcular_arbol(origen, usar_tiempo)
+            self._arboles[clave] = arbol
+        return arbol
+
+    def _calcular_arbol(self, origen: str, usar_tiempo: bool) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+        csr = self.obtener_csr()
+        inicio, destinos, pesos = csr.inicio, csr.destinos, csr.pesos(usar_tiempo)
+        id_origen = csr.ids[origen]
+
+        distancias = [math.inf] * csr.cantidad_nodos()
+        previos = [-1] * csr.cantidad_nodos()
+        distancias[id_origen] = 0.0
+        visitados = bytearray(csr.cantidad_nodos())
+        orden: List[int] = []
+        monticulo: List[Tuple[float, int]] = [(0.0, id_origen)]
+
+        while monticulo:
+            distancia_actual, nodo_actual = heapq.heappop(monticulo)
+            if visitados[nodo_actual]:
+                continue
+            visitados[nodo_actual] = 1
+            orden.append(nodo_actual)
+
+            for e in range(inicio[nodo_actual], inicio[nodo_actual + 1]):
+                vecino = destinos[e]
+                distancia = distancia_actual + pesos[e]
+                if distancia < distancias[vecino]:
+                    distancias[vecino] = distancia
+                    previos[vecino] = nodo_actual
+                    heapq.heappush(monticulo, (distancia, vecino))
+
+        nombres = csr.nombres
+        return (
+            {nombres[n]: distancias[n] for n in orden},
+            {nombres[n]: (nombres[previos[n]] if previos[n] >= 0 else None) for n in orden},
+        )
+
+    @staticmethod
+    def _reconstruir_camino(previos: Dict[str, Optional[str]], destino: str) -> List[str]:
         camino: List[str] = []
         nodo = destino
         while nodo is not None:
-            camino.insert(0, nodo)
+            camino.append(nodo)
             nodo = previos[nodo]
+        camino.reverse()
+        return camino
+
+    def obtener_rutas_alternativas(self, origen: str, destino: str, criterio: str = "tiempo",
+                                   k: int = 3) -> List[Tuple[float, List[str]]]:
+        """
+        Retorna hasta k rutas sin ciclos ordenadas de menor a mayor peso (algoritmo de Yen).
+        Cada ruta se representa como (distancia, camino).
+        """
+        usar_tiempo = (criterio == "tiempo")
+        if k <= 0 or origen not in self.nodos or destino not in self.nodos:
+            return []
+
+        distancia, camino = self._dijkstra(origen, destino, usar_tiempo)
+        if not camino:
+            return []
+
+        # Distancia exacta de cada nodo al destino: sirve como heuristica para los desvios
+        # y se reutiliza en todas las busquedas de la misma consulta.
+        hacia_destino = self._distancias_hacia(destino, usar_tiempo)
+
+        rutas: List[Tuple[float, List[str]]] = [(distancia, camino)]
+        desvios: List[int] = [0]
+        candidatos: List[Tuple[float, List[str], int]] = []
+        vistos = {tuple(camino)}
+
+        while len(rutas) < k:
+            _, camino_previo = rutas[-1]
+            peso_raiz = 0.0
+            for i in range(len(camino_previo) - 1):
+                if i > 0:
+                    peso_raiz += self._peso_minimo(camino_previo[i - 1], camino_previo[i], usar_tiempo)
+                # Los nodos anteriores al ultimo desvio ya se exploraron con la ruta padre
+                if i < desvios[-1]:
+                    continue
 
-        if not camino or camino[0] != origen:
-            return (math.inf, [])
+                nodo_desvio = camino_previo[i]
+                raiz = camino_previo[:i + 1]
+                aristas_excluidas = set()
+                for _, ruta in rutas:
+                    if len(ruta) > i + 1 and ruta[:i + 1] == raiz:
+                        aristas_excluidas.add((ruta[i], ruta[i + 1]))
+
+                distancia_desvio, camino_desvio = self._ruta_desvio(
+                    nodo_desvio, destino, usar_tiempo, set(raiz[:-1]), aristas_excluidas, hacia_destino
+                )
+                if not camino_desvio:
+                    continue
 
-        return (distancias[destino], camino)
+                camino_total = raiz[:-1] + camino_desvio
+                clave = tuple(camino_total)
+                if clave not in vistos:
+                    vistos.add(clave)
+                    heapq.heappush(candidatos, (peso_raiz + distancia_desvio, camino_total, i))
 
-    def obtener_rutas_alternativas(self, origen: str, destino: str, criterio: str = "tiempo") -> List[Tuple[float, List[str]]]:
-        
-        usar_tiempo = (criterio == "tiempo")
-        rutas = []
-        
-        rutas_prohibidas: set[Tuple[str, ...]] = set()
-        
-        for _ in range(3):
-            distancia, camino = self._dijkstra_con_prohibiciones(
-                origen, destino, usar_tiempo, rutas_prohibidas
-            )
-            
-            if distancia == math.inf or not camino:
+            if not candidatos:
                 break
-            
-            rutas.append((distancia, camino))
-            rutas_prohibidas.add(tuple(camino))
-        
-        return rutas
 
-    def _dijkstra_con_prohibiciones(self, origen: str, destino: str, usar_tiempo: bool, 
-                                     rutas_prohibidas: set[Tuple[str, ...]]) -> Tuple[float, List[str]]:
-        
-        if origen not in self.nodos or destino not in self.nodos:
-            return (math.inf, [])
+            distancia, camino, indice_desvio = heapq.heappop(candidatos)
+            rutas.append((distancia, camino))
+            desvios.append(indice_desvio)
 
-        distancias: Dict[str, float] = {nodo: math.inf for nodo in self.nodos}
-        previos: Dict[str, Optional[str]] = {nodo: None for nodo in self.nodos}
-        distancias[origen] = 0.0
-        visitados = set()
+        return rutas
 
-        while len(visitados) < len(self.nodos):
-            nodo_actual = None
-            distancia_minima = math.inf
+    def _distancias_hacia(self, destino: str, usar_tiempo: bool) -> List[float]:
+        csr = self.obtener_csr()
+        return self._distancias_csr(csr.ids[destino], usar_tiempo, inversa=True)
 
-            for nodo in self.nodos:
-                if nodo not in visitados and distancias[nodo] < distancia_minima:
-                    distancia_minima = distancias[nodo]
-                    nodo_actual = nodo
+    def _distancias_csr(self, id_inicio: int, usar_tiempo: bool, inversa: bool = False) -> List[float]:
+        """Distancias desde id_inicio (o hacia id_inicio si inversa) indexadas por id de nodo."""
+        csr = self.obtener_csr()
+        pesos = csr.pesos(usar_tiempo)
+        if inversa:
+            inicio, vecinos, aristas = csr.inicio_inv, csr.origenes_inv, csr.aristas_inv
+        else:
+            inicio, vecinos, aristas = csr.inicio, csr.destinos, None
+
+        distancias = [math.inf] * csr.cantidad_nodos()
+        distancias[id_inicio] = 0.0
+        visitados = bytearray(csr.cantidad_nodos())
+        monticulo: List[Tuple[float, int]] = [(0.0, id_inicio)]
+        while monticulo:
+            distancia_actual, nodo_actual = heapq.heappop(monticulo)
+            if visitados[nodo_actual]:
+                continue
+            visitados[nodo_actual] = 1
+            for r in range(inicio[nodo_actual], inicio[nodo_actual + 1]):
+                vecino = vecinos[r]
+                distancia = distancia_actual + pesos[aristas[r] if inversa else r]
+                if distancia < distancias[vecino]:
+                    distancias[vecino] = distancia
+                    heapq.heappush(monticulo, (distancia, vecino))
+        return distancias
+
+    def _ruta_desvio(self, inicio: str, destino: str, usar_tiempo: bool, nodos_excluidos: set,
+                     aristas_excluidas: set, hacia_destino: List[float]) -> Tuple[float, List[str]]:
+        csr = self.obtener_csr()
+        ids = csr.ids
+        id_inicio, id_destino = ids[inicio], ids[destino]
+        if hacia_destino[id_inicio] == math.inf:
+            return (math.inf, [])
 
-            if nodo_actual is None:
-                break
-            
-            # Si el nodo actual es el destino, verificamos si el camino es una ruta prohibida
-            if nodo_actual == destino:
-                camino_temporal = []
-                nodo = destino
-                while nodo is not None:
-                    camino_temporal.insert(0, nodo)
+        excluidos = bytearray(csr.cantidad_nodos())
+        for nodo in nodos_excluidos:
+            excluidos[ids[nodo]] = 1
+        aristas_prohibidas = {(ids[a], ids[b]) for a, b in aristas_excluidas}
+        inicio_csr, destinos, pesos = csr.inicio, csr.destinos, csr.pesos(usar_tiempo)
+
+        distancias: Dict[int, float] = {id_inicio: 0.0}
+        previos: Dict[int, int] = {id_inicio: -1}
+        cerrados = set()
+        monticulo: List[Tuple[float, float, int]] = [(hacia_destino[id_inicio], 0.0, id_inicio)]
+
+        while monticulo:
+            _, distancia_actual, nodo_actual = heapq.heappop(monticulo)
+            if nodo_actual in cerrados:
+                continue
+            if nodo_actual == id_destino:
+                camino: List[str] = []
+                nodo = id_destino
+                while nodo >= 0:
+                    camino.append(csr.nombres[nodo])
                     nodo = previos[nodo]
-                
-                if tuple(camino_temporal) in rutas_prohibidas:
-                    visitados.add(nodo_actual)
-                    continue
-
-            visitados.add(nodo_actual)
-
-            for arista in self.nodos[nodo_actual]:
-                peso = arista.tiempo if usar_tiempo else arista.costo
-                distancia = distancias[nodo_actual] + peso
-
-                if distancia < distancias[arista.destino]:
-                    distancias[arista.destino] = distancia
-                    previos[arista.destino] = nodo_actual
-
-        camino: List[str] = []
-        nodo = destino
-        while nodo is not None:
-            camino.insert(0, nodo)
-            nodo = previos[nodo]
+                camino.reverse()
+                return (distancia_actual, camino)
+            cerrados.add(nodo_actual)
 
-        if not camino or camino[0] != origen:
+            for e in range(inicio_csr[nodo_actual], inicio_csr[nodo_actual + 1]):
+                vecino = destinos[e]
+                if excluidos[vecino] or (nodo_actual, vecino) in aristas_prohibidas:
+                    continue
+                estimado = hacia_destino[vecino]
+                if estimado == math.inf:
+                    continue
+                distancia = distancia_actual + pesos[e]
+                if distancia < distancias.get(vecino, math.inf):
+                    distancias[vecino] = distancia
+                    previos[vecino] = nodo_actual
+                    heapq.heappush(monticulo, (distancia + estimado, distancia, vecino))
+
+        return (math.inf, [])
+
+    def _peso_minimo(self, origen: str, destino: str, usar_tiempo: bool) -> float:
+        csr = self.obtener_csr()
+        id_origen, id_destino = csr.ids[origen], csr.ids[destino]
+        e = csr.buscar_arista(id_origen, id_destino)
+        if e < 0:
+            return math.inf
+        pesos = csr.pesos(usar_tiempo)
+        minimo = pesos[e]
+        fin = csr.inicio[id_origen + 1]
+        while e + 1 < fin and csr.destinos[e + 1] == id_destino:
+            e += 1
+            minimo = min(minimo, pesos[e])
+        return minimo
+
+    # -------------------------------------------------
+    # A* con heuristicas admisibles
+    # -------------------------------------------------
+    def asignar_coordenadas(self, nodo: str, x: float, y: float) -> None:
+        self.coordenadas[nodo] = (float(x), float(y))
+        self._heuristicas.pop(("coordenadas", True), None)
+        self._heuristicas.pop(("coordenadas", False), None)
+        self._heuristicas.pop(("puntos", None), None)
+
+    def a_estrella(self, origen: str, destino: str, criterio: str = "tiempo",
+                   heuristica: str = "auto") -> Tuple[float, List[str]]:
+        """
+        Ruta optima entre dos nodos con A*. La heuristica puede ser "coordenadas"
+        (distancia euclidiana escalada, requiere coordenadas en todos los nodos),
+        "alt" (cotas por desigualdad triangular con landmarks) o "auto".
+        Retorna lo mismo que dijkstra_tiempo / dijkstra_costo.
+        """
+        usar_tiempo = (criterio == "tiempo")
+        if origen not in self.nodos or destino not in self.nodos:
             return (math.inf, [])
-        
-        # Última verificación para asegurar que el camino encontrado no sea una ruta prohibida
-        if tuple(camino) in rutas_prohibidas:
-             return (math.inf, [])
 
-        return (distancias[destino], camino)
+        csr = self.obtener_csr()
+        id_origen, id_destino = csr.ids[origen], csr.ids[destino]
+        estimar = self._obtener_heuristica(id_destino, usar_tiempo, heuristica)
+        inicio, destinos, pesos = csr.inicio, csr.destinos, csr.pesos(usar_tiempo)
+
+        distancias: Dict[int, float] = {id_origen: 0.0}
+        previos: Dict[int, int] = {id_origen: -1}
+        monticulo: List[Tuple[float, float, int]] = [(estimar(id_origen), 0.0, id_origen)]
+
+        while monticulo:
+            _, distancia_actual, nodo_actual = heapq.heappop(monticulo)
+            if distancia_actual > distancias[nodo_actual]:
+                continue
+            if nodo_actual == id_destino:
+                camino: List[str] = []
+                nodo = id_destino
+                while nodo >= 0:
+                    camino.append(csr.nombres[nodo])
+                    nodo = previos[nodo]
+                camino.reverse()
+                return (int(distancia_actual) if usar_tiempo else distancia_actual, camino)
+
+            for e in range(inicio[nodo_actual], inicio[nodo_actual + 1]):
+                vecino = destinos[e]
+                distancia = distancia_actual + pesos[e]
+                if distancia < distancias.get(vecino, math.inf):
+                    estimado = estimar(vecino)
+                    if estimado == math.inf:
+                        continue
+                    distancias[vecino] = distancia
+                    previos[vecino] = nodo_actual
+                    heapq.heappush(monticulo, (distancia + estimado, distancia, vecino))
+
+        return (math.inf, [])
+
+    def _obtener_heuristica(self, id_destino: int, usar_tiempo: bool, heuristica: str):
+        if heuristica == "auto":
+            completas = bool(self.nodos) and not self._puntos_coordenadas()[1]
+            heuristica = "coordenadas" if completas else "alt"
+
+        if heuristica == "coordenadas":
+            return self._heuristica_coordenadas(id_destino, usar_tiempo)
+        if heuristica == "alt":
+            return self._heuristica_alt(id_destino, usar_tiempo)
+        raise ValueError(f"Heuristica desconocida: {heuristica}")
+
+    def _puntos_coordenadas(self) -> Tuple[List[Tuple[float, float]], List[str]]:
+        """Coordenadas por indice del CSR y nodos sin coordenadas; se guardan hasta que cambien."""
+        clave = ("puntos", None)
+        datos = self._heuristicas.get(clave)
+        if datos is None:
+            nombres = self.obtener_csr().nombres
+            faltantes = [n for n in nombres if n not in self.coordenadas]
+            puntos = [] if faltantes else [self.coordenadas[n] for n in nombres]
+            datos = self._heuristicas[clave] = (puntos, faltantes)
+        return datos
+
+    def _heuristica_coordenadas(self, id_destino: int, usar_tiempo: bool):
+        csr = self.obtener_csr()
+        puntos, faltantes = self._puntos_coordenadas()
+        if faltantes:
+            raise ValueError(f"Nodos sin coordenadas: {', '.join(faltantes[:5])}")
+
+        clave = ("coordenadas", usar_tiempo)
+        factor = self._heuristicas.get(clave)
+        if factor is None:
+            # Mayor factor que nunca sobreestima: minimo de peso / distancia sobre todas las aristas
+            factor = math.inf
+            pesos = csr.pesos(usar_tiempo)
+            for origen in range(csr.cantidad_nodos()):
+                x1, y1 = puntos[origen]
+                for e in range(csr.inicio[origen], csr.inicio[origen + 1]):
+                    x2, y2 = puntos[csr.destinos[e]]
+                    distancia = math.hypot(x2 - x1, y2 - y1)
+                    if distancia > 0:
+                        factor = min(factor, pesos[e] / distancia)
+            if factor == math.inf:
+                factor = 0.0
+            self._heuristicas[clave] = factor
+
+        xd, yd = puntos[id_destino]
+        return lambda nodo: factor * math.hypot(puntos[nodo][0] - xd, puntos[nodo][1] - yd)
+
+    def _heuristica_alt(self, id_destino: int, usar_tiempo: bool):
+        clave = ("alt", usar_tiempo)
+        landmarks = self._heuristicas.get(clave)
+        if landmarks is None:
+            landmarks = self._calcular_landmarks(usar_tiempo)
+            self._heuristicas[clave] = landmarks
+
+        # Solo sirven las cotas de landmarks conectados con el destino
+        cotas = []
+        for desde, hacia in landmarks:
+            desde_destino = desde[id_destino]
+            hacia_destino = hacia[id_destino]
+            if desde_destino != math.inf or hacia_destino != math.inf:
+                cotas.append((desde, desde_destino, hacia, hacia_destino))
+
+        def estimar(nodo: int) -> float:
+            mejor = 0.0
+            for desde, desde_destino, hacia, hacia_destino in cotas:
+                if desde_destino != math.inf and desde[nodo] != math.inf:
+                    mejor = max(mejor, desde_destino - desde[nodo])
+                if hacia_destino != math.inf and hacia[nodo] != math.inf:
+                    mejor = max(mejor, hacia[nodo] - hacia_destino)
+            return mejor
+
+        return estimar
+
+    def _calcular_landmarks(self, usar_tiempo: bool) -> List[Tuple[List[float], List[float]]]:
+        """Elige landmarks alejados entre si y guarda las distancias desde y hacia cada uno."""
+        csr = self.obtener_csr()
+        total = csr.cantidad_nodos()
+        if total == 0:
+            return []
+
+        landmarks: List[Tuple[List[float], List[float]]] = []
+        elegidos = set()
+        cercania = [math.inf] * total
+        inicial = self._distancias_csr(0, usar_tiempo)
+        actual = max(range(total), key=lambda n: inicial[n] if inicial[n] != math.inf else -1)
+
+        for _ in range(min(self.cantidad_landmarks, total)):
+            desde = self._distancias_csr(actual, usar_tiempo)
+            hacia = self._distancias_csr(actual, usar_tiempo, inversa=True)
+            landmarks.append((desde, hacia))
+            elegidos.add(actual)
+            for n in range(total):
+                cercania[n] = min(cercania[n], desde[n])
+            candidatos = [n for n in range(total) if n not in elegidos]
+            if not candidatos:
+                break
+            # El siguiente landmark es el nodo mas lejano (o inalcanzable) desde los ya elegidos
+            actual = max(candidatos, key=lambda n: cercania[n])
+
+        return landmarks
 
     def obtener_pesos_arista(self, origen: str, destino: str) -> Optional[Tuple[int, float]]:
-        if origen not in self.nodos:
+        arista = self._aristas.get((origen, destino))
+        if arista is None:
             return None
-        for arista in self.nodos[origen]:
-            if arista.destino == destino:
-                return arista.tiempo, arista.costo
-        return None
+        return arista.tiempo, arista.costo
 
     def calcular_tiempo_ruta(self, ruta: List[str]) -> float:
-        if not ruta or len(ruta) < 2:
-            return 0.0
-        total = 0.0
-        for i in range(len(ruta) - 1):
-            pesos = self.obtener_pesos_arista(ruta[i], ruta[i + 1])
-            if not pesos:
-                return math.inf
-            total += pesos[0]
-        return total
+        return self._calcular_peso_ruta(ruta, usar_tiempo=True)
 
     def calcular_costo_ruta(self, ruta: List[str]) -> float:
+        return self._calcular_peso_ruta(ruta, usar_tiempo=False)
+
+    def _calcular_peso_ruta(self, ruta: List[str], usar_tiempo: bool) -> float:
         if not ruta or len(ruta) < 2:
             return 0.0
         total = 0.0
         for i in range(len(ruta) - 1):
-            pesos = self.obtener_pesos_arista(ruta[i], ruta[i + 1])
-            if not pesos:
+            arista = self._aristas.get((ruta[i], ruta[i + 1]))
+            if arista is None:
                 return math.inf
-            total += pesos[1]
+            total += arista.tiempo if usar_tiempo else arista.costo
         return total
 
     def calcular_eta(self, origen: str, destino: str, prioridad: str = "tiempo") -> int:
@@ -237,15 +607,10 @@ class Grafo:
         return nombre in self.nodos
 
     def obtener_grado_entrada(self, nodo: str) -> int:
-        if nodo not in self.nodos:
-            return 0
-        
-        grado = 0
-        for origen in self.nodos:
-            for arista in self.nodos[origen]:
-                if arista.destino == nodo:
-                    grado += 1
-        return grado
+        return self._grado_entrada.get(nodo, 0)
+
+    def obtener_predecesores(self, nodo: str) -> List[str]:
+        return list(self.entrantes.get(nodo, {}))
 
     def obtener_grado_salida(self, nodo: str) -> int:
         return len(self.nodos.get(nodo, []))
@@ -253,8 +618,6 @@ class Grafo:
     def obtener_estadisticas(self) -> dict:
         
         total_nodos = len(self.nodos)
-        total_aristas = sum(len(aristas) for aristas in self.nodos.values())
-        
         if total_nodos == 0:
             return {
                 "nodos": 0,
@@ -264,21 +627,25 @@ class Grafo:
                 "costo_promedio": 0
             }
         
+        # Contar no justifica compilar el CSR: se usa solo si ya esta compilado
+        csr = self._csr
+        if csr is not None:
+            grados = (csr.grado_salida(nodo) for nodo in range(total_nodos))
+            suma_tiempos = sum(csr.tiempos)
+            suma_costos = sum(csr.costos)
+        else:
+            grados = (len(aristas) for aristas in self.nodos.values())
+            suma_tiempos = sum(a.tiempo for aristas in self.nodos.values() for a in aristas)
+            suma_costos = sum(a.costo for aristas in self.nodos.values() for a in aristas)
+        
+        total_aristas = 0
         max_conexiones = -1
         nodo_mas_conectado = None
-        
-        suma_tiempos = 0
-        suma_costos = 0
-        
-        for nodo, aristas in self.nodos.items():
-            conexiones = len(aristas)
+        for nombre, conexiones in zip(self.nodos, grados):
+            total_aristas += conexiones
             if conexiones > max_conexiones:
                 max_conexiones = conexiones
-                nodo_mas_conectado = nodo
-            
-            for arista in aristas:
-                suma_tiempos += arista.tiempo
-                suma_costos += arista.costo
+                nodo_mas_conectado = nombre
         
         return {
             "nodos": total_nodos,
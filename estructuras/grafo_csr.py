@@ -0,0 +1,97 @@
+from array import array
+from bisect import bisect_left
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+
+class GrafoCSR:
+    """
+    Representacion compacta (Compressed Sparse Row) de un Grafo.
+    Los nodos se identifican con enteros y las aristas de cada nodo ocupan un tramo
+    contiguo de los arreglos destinos/tiempos/costos, ordenado por destino para poder
+    buscar una arista con busqueda binaria. Tambien guarda la adyacencia inversa.
+    Es de solo lectura: se vuelve a compilar cuando el grafo cambia. Es una copia
+    compilada junto a las listas de Arista de Grafo (que siguen siendo la forma
+    mutable y publica), asi que acelera los recorridos pero no reduce la memoria
+    total del grafo.
+    """
+
+    def __init__(self, nodos: Dict[str, list], version: int = 0):
+        self.version = version
+        self.nombres: List[str] = list(nodos)
+        self.ids: Dict[str, int] = {nombre: i for i, nombre in enumerate(self.nombres)}
+
+        self.inicio = array("l", [0])
+        self.destinos = array("l")
+        self.tiempos = array("q")
+        self.costos = array("d")
+
+        for nombre in self.nombres:
+            # sorted es estable: las aristas paralelas conservan su orden de insercion
+            aristas = sorted(nodos[nombre], key=lambda a: self.ids[a.destino])
+            for arista in aristas:
+                self.destinos.append(self.ids[arista.destino])
+                self.tiempos.append(int(arista.tiempo))
+                self.costos.append(float(arista.costo))
+            self.inicio.append(len(self.destinos))
+
+        self._compilar_inversa()
+
+    def _compilar_inversa(self) -> None:
+        total_nodos = len(self.nombres)
+        conteo = [0] * (total_nodos + 1)
+        for destino in self.destinos:
+            conteo[destino + 1] += 1
+        for i in range(total_nodos):
+            conteo[i + 1] += conteo[i]
+
+        self.inicio_inv = array("l", conteo)
+        self.origenes_inv = array("l", [0] * len(self.destinos))
+        self.aristas_inv = array("l", [0] * len(self.destinos))
+        posicion = conteo[:-1]
+        for origen in range(total_nodos):
+            for e in range(self.inicio[origen], self.inicio[origen + 1]):
+                destino = self.destinos[e]
+                self.origenes_inv[posicion[destino]] = origen
+                self.aristas_inv[posicion[destino]] = e
+                posicion[destino] += 1
+
+    # -------------------------------------------------
+    # Consultas
+    # -------------------------------------------------
+    def huella(self) -> str:
+        """Resumen del contenido de la red; cambia con cualquier cambio de nodos o aristas."""
+        resumen = hashlib.sha1("\x1f".join(self.nombres).encode("utf-8"))
+        for arreglo in (self.inicio, self.destinos, self.tiempos, self.costos):
+            resumen.update(arreglo.tobytes())
+        return resumen.hexdigest()
+
+    def cantidad_nodos(self) -> int:
+        return len(self.nombres)
+
+    def cantidad_aristas(self) -> int:
+        return len(self.destinos)
+
+    def grado_salida(self, nodo: int) -> int:
+        return self.inicio[nodo + 1] - self.inicio[nodo]
+
+    def pesos(self, usar_tiempo: bool):
+        return self.tiempos if usar_tiempo else self.costos
+
+    def buscar_arista(self, origen: int, destino: int) -> int:
+        """Retorna la posicion de la primera arista origen->destino o -1."""
+        fin = self.inicio[origen + 1]
+        e = bisect_left(self.destinos, destino, self.inicio[origen], fin)
+        if e < fin and self.destinos[e] == destino:
+            return e
+        return -1
+
+    def obtener_pesos(self, origen: str, destino: str) -> Optional[Tuple[int, float]]:
+        id_origen = self.ids.get(origen)
+        id_destino = self.ids.get(destino)
+        if id_origen is None or id_destino is None:
+            return None
+        e = self.buscar_arista(id_origen, id_destino)
+        if e < 0:
+            return None
+        return self.tiempos[e], self.costos[e]
@@ -0,0 +1,255 @@
+from typing import Dict, List, Optional, Tuple
+import heapq
+import json
+import math
+
+from estructuras.grafo import Grafo
+
+
+class JerarquiaContraccion:
+    """
+    Indice de jerarquias de contraccion (Contraction Hierarchies) para un criterio
+    ("tiempo" o "costo"). Se construye una vez contrayendo los nodos en orden de
+    importancia y agregando atajos; despues cada consulta es una busqueda
+    bidireccional que solo sube de rango, y los atajos se desempacan para
+    devolver la ruta original.
+    """
+
+    FORMATO = 1
+
+    def __init__(self, criterio: str = "tiempo", limite_testigos: int = 60):
+        self.criterio = criterio
+        self.limite_testigos = limite_testigos
+        self.version: Optional[int] = None
+        self.huella = ""
+        self.nombres: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.rango: List[int] = []
+        # arriba[u]: aristas u -> x con rango[x] > rango[u]; abajo[u]: aristas x -> u con rango[x] > rango[u]
+        self.arriba: List[List[Tuple[int, float]]] = []
+        self.abajo: List[List[Tuple[int, float]]] = []
+        # Nodo contraido que reemplaza cada atajo (origen, destino)
+        self.intermedios: Dict[Tuple[int, int], int] = {}
+
+    # -------------------------------------------------
+    # Construccion
+    # -------------------------------------------------
+    def construir(self, grafo: Grafo) -> "JerarquiaContraccion":
+        csr = grafo.obtener_csr()
+        self.version = grafo.version
+        self.huella = csr.huella()
+        self.nombres = list(csr.nombres)
+        self.ids = dict(csr.ids)
+        total = len(self.nombres)
+        pesos = csr.pesos(self.criterio == "tiempo")
+
+        salida: List[Dict[int, float]] = [{} for _ in range(total)]
+        entrada: List[Dict[int, float]] = [{} for _ in range(total)]
+        for u in range(total):
+            for e in range(csr.inicio[u], csr.inicio[u + 1]):
+                x = csr.destinos[e]
+                if x != u and pesos[e] < salida[u].get(x, math.inf):
+                    salida[u][x] = pesos[e]
+                    entrada[x][u] = pesos[e]
+
+        self.rango = [0] * total
+        self.arriba = [[] for _ in range(total)]
+        self.abajo = [[] for _ in range(total)]
+        self.intermedios = {}
+        contraidos = bytearray(total)
+        vecinos_contraidos = [0] * total
+
+        def prioridad(v: int) -> int:
+            diferencia = len(self._atajos(v, salida, entrada)) - len(salida[v]) - len(entrada[v])
+            return diferencia + vecinos_contraidos[v]
+
+        pendientes = [(prioridad(v), v) for v in range(total)]
+        heapq.heapify(pendientes)
+        siguiente_rango = 0
+
+        while pendientes:
+            _, v = heapq.heappop(pendientes)
+            if contraidos[v]:
+                continue
+            # Actualizacion perezosa: si la prioridad empeoro, se reintenta mas tarde
+            nueva = prioridad(v)
+            if pendientes and nueva > pendientes[0][0]:
+                heapq.heappush(pendientes, (nueva, v))
+                continue
+
+            for u, x, peso in self._atajos(v, salida, entrada):
+                if peso < salida[u].get(x, math.inf):
+                    salida[u][x] = peso
+                    entrada[x][u] = peso
+                    self.intermedios[(u, x)] = v
+
+            self.arriba[v] = list(salida[v].items())
+            self.abajo[v] = list(entrada[v].items())
+            for x in salida[v]:
+                del entrada[x][v]
+                vecinos_contraidos[x] += 1
+            for u in entrada[v]:
+                del salida[u][v]
+                vecinos_contraidos[u] += 1
+            salida[v] = {}
+            entrada[v] = {}
+
+            contraidos[v] = 1
+            self.rango[v] = siguiente_rango
+            siguiente_rango += 1
+
+        return self
+
+    def _atajos(self, v: int, salida: List[Dict[int, float]],
+                entrada: List[Dict[int, float]]) -> List[Tuple[int, int, float]]:
+        """Atajos u -> x necesarios al contraer v (sin camino testigo igual o mas corto)."""
+        atajos = []
+        for u, peso_entrada in entrada[v].items():
+            objetivos = {x: peso_entrada + peso_salida for x, peso_salida in salida[v].items() if x != u}
+            if not objetivos:
+                continue
+            testigos = self._buscar_testigos(u, v, max(objetivos.values()), objetivos, salida)
+            for x, peso in objetivos.items():
+                if testigos.get(x, math.inf) > peso:
+                    atajos.append((u, x, peso))
+        return atajos
+
+    def _buscar_testigos(self, inicio: int, excluido: int, limite: float, objetivos: Dict[int, float],
+                         salida: List[Dict[int, float]]) -> Dict[int, float]:
+        distancias: Dict[int, float] = {inicio: 0.0}
+        monticulo: List[Tuple[float, int]] = [(0.0, inicio)]
+        faltantes = set(objetivos)
+        asentados = 0
+        while monticulo and faltantes and asentados < self.limite_testigos:
+            distancia_actual, nodo = heapq.heappop(monticulo)
+            if distancia_actual > distancias[nodo]:
+                continue
+            if distancia_actual > limite:
+                break
+            asentados += 1
+            faltantes.discard(nodo)
+            for vecino, peso in salida[nodo].items():
+                if vecino == excluido:
+                    continue
+                distancia = distancia_actual + peso
+                if distancia < distancias.get(vecino, math.inf):
+                    distancias[vecino] = distancia
+                    heapq.heappush(monticulo, (distancia, vecino))
+        return distancias
+
+    def vigente(self, grafo: Grafo) -> bool:
+        """Indica si el indice corresponde a la topologia actual del grafo."""
+        if self.version is not None and self.version == grafo.version:
+            return True
+        if self.huella and self.huella == grafo.obtener_csr().huella():
+            self.version = grafo.version
+            return True
+        return False
+
+    # -------------------------------------------------
+    # Consultas
+    # -------------------------------------------------
+    def ruta(self, origen: str, destino: str) -> Tuple[float, List[str]]:
+        if origen not in self.ids or destino not in self.ids:
+            return (math.inf, [])
+        id_origen, id_destino = self.ids[origen], self.ids[destino]
+        if id_origen == id_destino:
+            return (0, [origen]) if self.criterio == "tiempo" else (0.0, [origen])
+
+        distancias_ida, previos_ida = self._buscar_hacia_arriba(id_origen, self.arriba, self.abajo)
+        distancias_vuelta, previos_vuelta = self._buscar_hacia_arriba(id_destino, self.abajo, self.arriba)
+
+        mejor = math.inf
+        encuentro = -1
+        for nodo, distancia in distancias_ida.items():
+            total = distancia + distancias_vuelta.get(nodo, math.inf)
+            if total < mejor:
+                mejor = total
+                encuentro = nodo
+        if encuentro < 0:
+            return (math.inf, [])
+
+        tramos: List[Tuple[int, int]] = []
+        nodo = encuentro
+        while previos_ida[nodo] >= 0:
+            tramos.append((previos_ida[nodo], nodo))
+            nodo = previos_ida[nodo]
+        tramos.reverse()
+        nodo = encuentro
+        while previos_vuelta[nodo] >= 0:
+            tramos.append((nodo, previos_vuelta[nodo]))
+            nodo = previos_vuelta[nodo]
+
+        camino = [origen]
+        for inicio, fin in tramos:
+            self._desempacar(inicio, fin, camino)
+        return (int(mejor) if self.criterio == "tiempo" else mejor, camino)
+
+    def _buscar_hacia_arriba(self, inicio: int, aristas: List[List[Tuple[int, float]]],
+                             opuestas: List[List[Tuple[int, float]]]) -> Tuple[Dict[int, float], Dict[int, int]]:
+        distancias: Dict[int, float] = {inicio: 0.0}
+        previos: Dict[int, int] = {inicio: -1}
+        monticulo: List[Tuple[float, int]] = [(0.0, inicio)]
+        while monticulo:
+            distancia_actual, nodo = heapq.heappop(monticulo)
+            if distancia_actual > distancias[nodo]:
+                continue
+            # Stall-on-demand: si un nodo de rango mayor llega mas barato, este nodo no
+            # puede estar en un camino minimo y no se expande
+            if any(distancias.get(vecino, math.inf) + peso < distancia_actual for vecino, peso in opuestas[nodo]):
+                continue
+            for vecino, peso in aristas[nodo]:
+                distancia = distancia_actual + peso
+                if distancia < distancias.get(vecino, math.inf):
+                    distancias[vecino] = distancia
+                    previos[vecino] = nodo
+                    heapq.heappush(monticulo, (distancia, vecino))
+        return distancias, previos
+
+    def _desempacar(self, inicio: int, fin: int, camino: List[str]) -> None:
+        pila = [(inicio, fin)]
+        while pila:
+            a, b = pila.pop()
+            intermedio = self.intermedios.get((a, b))
+            if intermedio is None:
+                camino.append(self.nombres[b])
+            else:
+                pila.append((intermedio, b))
+                pila.append((a, intermedio))
+
+    # -------------------------------------------------
+    # Persistencia
+    # -------------------------------------------------
+    def guardar(self, ruta_archivo: str) -> None:
+        datos = {
+            "formato": self.FORMATO,
+            "criterio": self.criterio,
+            "huella": self.huella,
+            "nombres": self.nombres,
+            "rango": self.rango,
+            "arriba": self.arriba,
+            "abajo": self.abajo,
+            "intermedios": [[a, b, m] for (a, b), m in self.intermedios.items()],
+        }
+        with open(ruta_archivo, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo)
+
+    @classmethod
+    def cargar(cls, ruta_archivo: str) -> Optional["JerarquiaContraccion"]:
+        try:
+            with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        if datos.get("formato") != cls.FORMATO:
+            return None
+
+        jerarquia = cls(datos["criterio"])
+        jerarquia.huella = datos["huella"]
+        jerarquia.nombres = datos["nombres"]
+        jerarquia.ids = {nombre: i for i, nombre in enumerate(jerarquia.nombres)}
+        jerarquia.rango = datos["rango"]
+        jerarquia.arriba = [[(x, peso) for x, peso in aristas] for aristas in datos["arriba"]]
+        jerarquia.abajo = [[(x, peso) for x, peso in aristas] for aristas in datos["abajo"]]
+        jerarquia.intermedios = {(a, b): m for a, b, m in datos["intermedios"]}
+        return jerarquia
@@ -13,6 +13,21 @@ class ListaLibros:
         self.cabeza = None
         self.tamanio = 0 
 
+    # La lista se serializa como arreglo para no recursar nodo por nodo (pickle)
+    def __getstate__(self):
+        libros = []
+        actual = self.cabeza
+        while actual:
+            libros.append(actual.data)
+            actual = actual.siguiente
+        return {"libros": libros}
+
+    def __setstate__(self, estado):
+        self.cabeza = None
+        self.tamanio = 0
+        for libro in reversed(estado["libros"]):
+            self.insertar(libro)
+
     def insertar(self, libro: Libro):
         nuevo = NodoLista(libro)
         nuevo.siguiente = self.cabeza
@@ -11,6 +11,16 @@ class Pila:
         self.tope: Optional[NodoPila] = None
         self.tamanio = 0
 
+    # Se serializa como arreglo (del tope al fondo) para no recursar nodo por nodo (pickle)
+    def __getstate__(self):
+        return {"elementos": self.listar()}
+
+    def __setstate__(self, estado):
+        self.tope = None
+        self.tamanio = 0
+        for elemento in reversed(estado["elementos"]):
+            self.apilar(elemento)
+
     def apilar(self, libro: Libro):
         nuevo = NodoPila(libro)
         nuevo.siguiente = self.tope
@@ -31,6 +41,10 @@ class Pila:
     def pop(self) -> Optional[Libro]:
         return self.desapilar()
 
+    def limpiar(self) -> None:
+        self.tope = None
+        self.tamanio = 0
+
     def esta_vacia(self) -> bool:
         return self.tope is None
 
@@ -22,9 +22,11 @@ class TablaHash:
         hash_val = 0
         A = 0.6180339887
         
-        for i, char in enumerate(isbn):
-            hash_val += ord(char) * (31 ** i)
-        
+        # Polinomio en base 31 por Horner, acotado a 32 bits para que el producto
+        # con A en punto flotante conserve los bits bajos
+        for char in isbn:
+            hash_val = (hash_val * 31 + ord(char)) & 0xFFFFFFFF
+
         hash_val = int(self.capacidad * ((hash_val * A) % 1))
         return hash_val % self.capacidad
 
@@ -52,17 +54,30 @@ class TablaHash:
         return self.cantidad / self.capacidad
 
     def _rehash(self):
+        self._redistribuir(self._siguiente_primo(self.capacidad * 2))
+
+    def _redistribuir(self, nueva_capacidad: int):
+        # Los nodos se reenlazan tal cual: no hace falta revisar duplicados
         tabla_vieja = self.tabla
         
-        self.capacidad = self._siguiente_primo(self.capacidad * 2)
+        self.capacidad = nueva_capacidad
         self.tabla = [None] * self.capacidad
-        self.cantidad = 0
         
         for bucket in tabla_vieja:
             actual = bucket
             while actual:
-                self.insertar(actual.libro)
-                actual = actual.siguiente
+                siguiente = actual.siguiente
+                indice = self._hash(actual.libro.isbn)
+                actual.siguiente = self.tabla[indice]
+                self.tabla[indice] = actual
+                actual = siguiente
+
+    def reservar(self, cantidad: int):
+        """Agranda la tabla de una vez para `cantidad` libros, sin rehash intermedios."""
+        necesaria = int(cantidad / self.factor_carga_maximo) + 1
+        if necesaria > self.capacidad:
+            # Al menos se duplica, para que reservas sucesivas (carga por bloques) sigan siendo O(1) amortizado
+            self._redistribuir(self._siguiente_primo(max(necesaria, self.capacidad * 2)))
 
     # -------------------------------------------------
     # Operaciones CRUD
@@ -122,15 +137,15 @@ class TablaHash:
     # -------------------------------------------------
     # Mostrar y listar
     # -------------------------------------------------
-    def mostrar_inorder(self):
-        libros = []
+    def _libros(self):
         for bucket in self.tabla:
             actual = bucket
             while actual:
-                libros.append(actual.libro)
+                yield actual.libro
                 actual = actual.siguiente
-        
-        libros.sort(key=lambda l: l.isbn)
+
+    def mostrar_inorder(self):
+        libros = sorted(self._libros(), key=lambda l: l.isbn)
         
         print("\nLibros ordenados por ISBN:")
         print("=" * 80)
@@ -139,19 +154,12 @@ class TablaHash:
         print("=" * 80)
 
     def listar_isbns(self):
-        libros = []
-        for bucket in self.tabla:
-            actual = bucket
-            while actual:
-                libros.append(actual.libro)
-                actual = actual.siguiente
+        libros = sorted(self._libros(), key=lambda l: l.isbn)
         
         if not libros:
             print("No hay ISBNs disponibles.")
             return
         
-        libros.sort(key=lambda l: l.isbn)
-        
         max_isbn = max(len(l.isbn) for l in libros)
         max_titulo = max(len(l.titulo) for l in libros)
         max_autor = max(len(l.autor) for l in libros)
@@ -180,7 +188,7 @@ class TablaHash:
         
         print("=" * ancho_total)
 
-    def mostrar_estadisticas(self):
+    def obtener_estadisticas(self) -> dict:
         colisiones = 0
         max_cadena = 0
         buckets_usados = 0
@@ -197,15 +205,28 @@ class TablaHash:
                     colisiones += longitud - 1
                 max_cadena = max(max_cadena, longitud)
         
+        return {
+            "capacidad": self.capacidad,
+            "cantidad": self.cantidad,
+            "buckets_usados": buckets_usados,
+            "buckets_vacios": self.capacidad - buckets_usados,
+            "factor_carga": self._factor_carga(),
+            "colisiones": colisiones,
+            "max_cadena": max_cadena,
+        }
+
+    def mostrar_estadisticas(self):
+        stats = self.obtener_estadisticas()
+        
         print("\nESTADÍSTICAS DE LA TABLA HASH")
         print("=" * 50)
-        print(f"Capacidad total:         {self.capacidad}")
-        print(f"Elementos almacenados:   {self.cantidad}")
-        print(f"Buckets utilizados:      {buckets_usados}")
-        print(f"Buckets vacíos:          {self.capacidad - buckets_usados}")
-        print(f"Factor de carga:         {self._factor_carga():.2%}")
-        print(f"Total de colisiones:     {colisiones}")
-        print(f"Cadena más larga:        {max_cadena} elementos")
+        print(f"Capacidad total:         {stats['capacidad']}")
+        print(f"Elementos almacenados:   {stats['cantidad']}")
+        print(f"Buckets utilizados:      {stats['buckets_usados']}")
+        print(f"Buckets vacíos:          {stats['buckets_vacios']}")
+        print(f"Factor de carga:         {stats['factor_carga']:.2%}")
+        print(f"Total de colisiones:     {stats['colisiones']}")
+        print(f"Cadena más larga:        {stats['max_cadena']} elementos")
         print("=" * 50)
 
     # -------------------------------------------------
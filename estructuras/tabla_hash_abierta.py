@@ -0,0 +1,209 @@
+from array import array
+from typing import List, Optional
+
+from objetos.libro import Libro
+from estructuras.tabla_hash import TablaHash
+
+
+class TablaHashAbierta(TablaHash):
+    """
+    Tabla hash por ISBN con direccionamiento abierto (sondeo lineal Robin Hood).
+    Claves, libros y hashes se guardan en arreglos paralelos, sin un nodo por libro;
+    el hash de cada ISBN se calcula una sola vez y se reutiliza al redimensionar.
+    Mantiene la misma interfaz que TablaHash (insertar/buscar/eliminar y estadisticas).
+    """
+
+    def __init__(self, capacidad_inicial: int = 16):
+        super().__init__()
+        # Los libros viven en los arreglos de sondeo, no en las cadenas de la base
+        self.tabla = None
+        capacidad = 8
+        while capacidad < capacidad_inicial:
+            capacidad *= 2
+        self.cantidad = 0
+        self.factor_carga_maximo = 0.8
+        self._reservar(capacidad)
+
+    def _reservar(self, capacidad: int) -> None:
+        self.capacidad = capacidad
+        self._mascara = capacidad - 1
+        self._claves: List[Optional[str]] = [None] * capacidad
+        self._valores: List[Optional[Libro]] = [None] * capacidad
+        self._hashes = array("q", [0]) * capacidad
+
+    # hash() de str cambia entre procesos: al serializar se guardan solo los libros
+    # y los hashes se vuelven a calcular al cargar
+    def __getstate__(self):
+        return {
+            "capacidad": self.capacidad,
+            "factor_carga_maximo": self.factor_carga_maximo,
+            "libros": list(self._libros()),
+        }
+
+    def __setstate__(self, estado):
+        self.__init__(estado["capacidad"])
+        self.factor_carga_maximo = estado["factor_carga_maximo"]
+        self.cantidad = len(estado["libros"])
+        for libro in estado["libros"]:
+            self._colocar(hash(libro.isbn), libro.isbn, libro)
+
+    # -------------------------------------------------
+    # Sondeo
+    # -------------------------------------------------
+    def _posicion(self, isbn: str, valor_hash: int) -> int:
+        mascara = self._mascara
+        claves = self._claves
+        hashes = self._hashes
+        i = valor_hash & mascara
+        distancia = 0
+        while True:
+            clave = claves[i]
+            if clave is None:
+                return -1
+            # Robin Hood: si el ocupante esta mas cerca de su casilla, la clave no existe
+            if ((i - hashes[i]) & mascara) < distancia:
+                return -1
+            if hashes[i] == valor_hash and clave == isbn:
+                return i
+            i = (i + 1) & mascara
+            distancia += 1
+
+    def _colocar(self, valor_hash: int, clave: str, valor: Libro) -> None:
+        """Inserta sin revisar duplicados, cediendo la casilla al elemento mas lejano de su origen."""
+        mascara = self._mascara
+        claves = self._claves
+        valores = self._valores
+        hashes = self._hashes
+        i = valor_hash & mascara
+        distancia = 0
+        while True:
+            if claves[i] is None:
+                claves[i] = clave
+                valores[i] = valor
+                hashes[i] = valor_hash
+                return
+            distancia_actual = (i - hashes[i]) & mascara
+            if distancia_actual < distancia:
+                valor_hash, hashes[i] = hashes[i], valor_hash
+                clave, claves[i] = claves[i], clave
+                valor, valores[i] = valores[i], valor
+                distancia = distancia_actual
+            i = (i + 1) & mascara
+            distancia += 1
+
+    def _rehash(self):
+        self._redistribuir(self.capacidad * 2)
+
+    def _redistribuir(self, nueva_capacidad: int):
+        claves = self._claves
+        valores = self._valores
+        hashes = self._hashes
+        self._reservar(nueva_capacidad)
+        for i, clave in enumerate(claves):
+            if clave is not None:
+                self._colocar(hashes[i], clave, valores[i])
+
+    def reservar(self, cantidad: int):
+        capacidad = self.capacidad
+        while cantidad > capacidad * self.factor_carga_maximo:
+            capacidad *= 2
+        if capacidad > self.capacidad:
+            self._redistribuir(capacidad)
+
+    # -------------------------------------------------
+    # Operaciones CRUD
+    # -------------------------------------------------
+    def insertar(self, libro: Libro) -> bool:
+        valor_hash = hash(libro.isbn)
+        if self._posicion(libro.isbn, valor_hash) >= 0:
+            return False
+
+        if self.cantidad + 1 > self.capacidad * self.factor_carga_maximo:
+            self._rehash()
+
+        self._colocar(valor_hash, libro.isbn, libro)
+        self.cantidad += 1
+        return True
+
+    def buscar(self, isbn: str) -> Optional[Libro]:
+        i = self._posicion(isbn, hash(isbn))
+        return self._valores[i] if i >= 0 else None
+
+    def eliminar(self, isbn: str) -> bool:
+        i = self._posicion(isbn, hash(isbn))
+        if i < 0:
+            return False
+
+        # Borrado por desplazamiento hacia atras: no quedan lapidas
+        mascara = self._mascara
+        claves = self._claves
+        valores = self._valores
+        hashes = self._hashes
+        j = (i + 1) & mascara
+        while claves[j] is not None and ((j - hashes[j]) & mascara) != 0:
+            claves[i] = claves[j]
+            valores[i] = valores[j]
+            hashes[i] = hashes[j]
+            i = j
+            j = (j + 1) & mascara
+        claves[i] = None
+        valores[i] = None
+        self.cantidad -= 1
+        return True
+
+    def destruir(self):
+        self.cantidad = 0
+        self._reservar(self.capacidad)
+
+    def _libros(self):
+        for libro in self._valores:
+            if libro is not None:
+                yield libro
+
+    # -------------------------------------------------
+    # Estadisticas
+    # -------------------------------------------------
+    def obtener_estadisticas(self) -> dict:
+        # En direccionamiento abierto una colision es un libro fuera de su casilla,
+        # y la "cadena" es la longitud del sondeo mas largo
+        colisiones = 0
+        max_sondeo = 0
+        mascara = self._mascara
+        for i, clave in enumerate(self._claves):
+            if clave is not None:
+                distancia = (i - self._hashes[i]) & mascara
+                if distancia:
+                    colisiones += 1
+                max_sondeo = max(max_sondeo, distancia + 1)
+
+        return {
+            "capacidad": self.capacidad,
+            "cantidad": self.cantidad,
+            "buckets_usados": self.cantidad,
+            "buckets_vacios": self.capacidad - self.cantidad,
+            "factor_carga": self._factor_carga(),
+            "colisiones": colisiones,
+            "max_cadena": max_sondeo,
+        }
+
+    # -------------------------------------------------
+    # Exportar a DOT
+    # -------------------------------------------------
+    def exportar_dot(self, archivo: str):
+        with open(archivo, "w", encoding="utf-8") as out:
+            out.write("digraph TablaHash {\n")
+            out.write('    rankdir=LR;\n')
+            out.write('    node [shape=record];\n\n')
+
+            etiquetas = []
+            for i, libro in enumerate(self._valores):
+                if libro is None:
+                    etiquetas.append(f'<f{i}> {i}')
+                else:
+                    etiquetas.append(f'<f{i}> {i}: {libro.isbn[-6:]}')
+            out.write('    tabla [label="')
+            out.write('|'.join(etiquetas))
+            out.write('", shape=record, style=filled, fillcolor=lightgray];\n')
+            out.write("}\n")
+
+        print(f"Archivo DOT generado: {archivo}")
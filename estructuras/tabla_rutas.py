@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import math
+
+from estructuras.grafo import Grafo
+
+Arbol = Tuple[Dict[str, float], Dict[str, Optional[str]]]
+
+_grafo_trabajador: Optional[Grafo] = None
+
+
+def _iniciar_trabajador(grafo: Grafo) -> None:
+    global _grafo_trabajador
+    _grafo_trabajador = grafo
+
+
+def _calcular_arboles(origenes: List[str]) -> List[Tuple[str, Arbol, Arbol]]:
+    return [
+        (origen,
+         _grafo_trabajador.obtener_arbol_caminos(origen, True),
+         _grafo_trabajador.obtener_arbol_caminos(origen, False))
+        for origen in origenes
+    ]
+
+
+class TablaRutas:
+    """
+    Tabla de enrutamiento de todos los pares para tiempo y costo.
+    Cada fila guarda el arbol de caminos minimos de un origen (distancias y previos),
+    de modo que la distancia se lee en O(1) y la ruta en O(longitud de la ruta).
+    Las filas se calculan bajo demanda o todas juntas con construir(). Al agregar
+    una conexion solo se descartan las filas afectadas; cualquier otro cambio del
+    grafo descarta la tabla entera.
+    """
+
+    def __init__(self, grafo: Grafo):
+        self.grafo = grafo
+        self.filas: Dict[bool, Dict[str, Arbol]] = {True: {}, False: {}}
+        self.version = grafo.version
+
+    # -------------------------------------------------
+    # Construccion
+    # -------------------------------------------------
+    def construir(self, procesos: int = 1) -> None:
+        """Calcula las filas de todos los origenes, opcionalmente en varios procesos."""
+        self._sincronizar()
+        pendientes = [n for n in self.grafo.nodos
+                      if n not in self.filas[True] or n not in self.filas[False]]
+        if not pendientes:
+            return
+
+        if procesos <= 1 or len(pendientes) < 2 * procesos:
+            for origen in pendientes:
+                self._fila(origen, True)
+                self._fila(origen, False)
+            return
+
+        tamanio = math.ceil(len(pendientes) / (procesos * 4))
+        bloques = [pendientes[i:i + tamanio] for i in range(0, len(pendientes), tamanio)]
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                                 initargs=(self.grafo,)) as ejecutor:
+            for resultado in ejecutor.map(_calcular_arboles, bloques):
+                for origen, arbol_tiempo, arbol_costo in resultado:
+                    self.filas[True][origen] = arbol_tiempo
+                    self.filas[False][origen] = arbol_costo
+
+    def preparar(self, origen: str) -> None:
+        """Calcula (si faltan) las filas de tiempo y costo de un origen."""
+        if origen not in self.grafo.nodos:
+            return
+        self._sincronizar()
+        self._fila(origen, True)
+        self._fila(origen, False)
+
+    def _fila(self, origen: str, usar_tiempo: bool) -> Arbol:
+        fila = self.filas[usar_tiempo].get(origen)
+        if fila is None:
+            fila = self.grafo.obtener_arbol_caminos(origen, usar_tiempo)
+            self.filas[usar_tiempo][origen] = fila
+        return fila
+
+    def _sincronizar(self) -> None:
+        # Cambios hechos directamente sobre el grafo sin notificar: se descarta todo
+        if self.version != self.grafo.version:
+            self.limpiar()
+
+    def limpiar(self) -> None:
+        self.filas[True].clear()
+        self.filas[False].clear()
+        self.version = self.grafo.version
+
+    # -------------------------------------------------
+    # Consultas
+    # -------------------------------------------------
+    def distancia(self, origen: str, destino: str, criterio: str = "tiempo") -> float:
+        if origen not in self.grafo.nodos or destino not in self.grafo.nodos:
+            return math.inf
+        self._sincronizar()
+        distancias, _ = self._fila(origen, criterio == "tiempo")
+        return distancias.get(destino, math.inf)
+
+    def ruta(self, origen: str, destino: str, criterio: str = "tiempo") -> Tuple[float, List[str]]:
+        if origen not in self.grafo.nodos or destino not in self.grafo.nodos:
+            return (math.inf, [])
+        self._sincronizar()
+        usar_tiempo = criterio == "tiempo"
+        distancias, previos = self._fila(origen, usar_tiempo)
+        if destino not in distancias:
+            return (math.inf, [])
+
+        camino: List[str] = []
+        nodo = destino
+        while nodo is not None:
+            camino.append(nodo)
+            nodo = previos[nodo]
+        camino.reverse()
+
+        distancia = distancias[destino]
+        return (int(distancia) if usar_tiempo else distancia, camino)
+
+    def consultar(self, origen: str, destino: str, criterio: str = "tiempo") -> Tuple[float, List[str]]:
+        """
+        Ruta para una consulta suelta. Si el origen ya tiene fila se lee de la tabla;
+        si no, se deja al Dijkstra del grafo, que es bidireccional la primera vez y
+        guarda el arbol completo solo si el origen se repite (y ese arbol es el que
+        luego toma la tabla como fila).
+        """
+        usar_tiempo = criterio == "tiempo"
+        self._sincronizar()
+        if origen in self.filas[usar_tiempo]:
+            return self.ruta(origen, destino, criterio)
+        if usar_tiempo:
+            return self.grafo.dijkstra_tiempo(origen, destino)
+        return self.grafo.dijkstra_costo(origen, destino)
+
+    def siguiente_salto(self, origen: str, destino: str, criterio: str = "tiempo") -> Optional[str]:
+        _, camino = self.ruta(origen, destino, criterio)
+        return camino[1] if len(camino) > 1 else None
+
+    # -------------------------------------------------
+    # Actualizacion incremental
+    # -------------------------------------------------
+    def arista_agregada(self, origen: str, destino: str, tiempo: int, costo: float,
+                        bidireccional: bool = True) -> None:
+        """Descarta solo las filas en las que la nueva conexion acorta algun camino."""
+        if self._registrar_cambio():
+            self._descartar_mejoradas(origen, destino, tiempo, costo)
+            if bidireccional:
+                self._descartar_mejoradas(destino, origen, tiempo, costo)
+
+    def _registrar_cambio(self) -> bool:
+        # Solo se puede actualizar por partes si este es el unico cambio desde la ultima sincronizacion
+        if self.grafo.version != self.version + 1:
+            self.limpiar()
+            return False
+        self.version = self.grafo.version
+        return True
+
+    def _descartar_mejoradas(self, origen: str, destino: str, tiempo: int, costo: float) -> None:
+        for usar_tiempo, filas in self.filas.items():
+            peso = tiempo if usar_tiempo else costo
+            obsoletas = [
+                o for o, (distancias, _) in filas.items()
+                if distancias.get(origen, math.inf) + peso < distancias.get(destino, math.inf)
+            ]
+            for o in obsoletas:
+                del filas[o]
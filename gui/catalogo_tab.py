@@ -361,18 +361,7 @@ class CatalogoTab:
                     except ValueError:
                         continue
                     
-                    lista_resultado = catalogo.buscar_por_rango_fechas(inicio, fin)
-                    
-                    libros_encontrados = []
-                    if hasattr(lista_resultado, 'cabeza'): 
-                        actual = lista_resultado.cabeza
-                        while actual:
-                            libros_encontrados.append(actual.data)
-                            actual = actual.siguiente
-                    else:
-                        libros_encontrados = lista_resultado
-                    
-                    for libro in libros_encontrados:
+                    for libro in catalogo.iterar_rango_fechas(inicio, fin):
                         libros.append((libro, biblioteca_id))
 
             except Exception as e:
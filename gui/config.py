@@ -2,6 +2,8 @@
 Configuración centralizada de colores, estilos y constantes de la GUI
 """
 
+import os
+
 # ============ COLORES ============
 BG_COLOR = "#e6f0ff"        
 TITLE_COLOR = "#2a2a72"     
@@ -15,6 +17,11 @@ WINDOW_TITLE = "📚 Biblioteca Mágica Alrededor del Mundo - Sistema de Gestió
 WINDOW_GEOMETRY = "1200x800"
 THEME = "clam"
 
+# ============ PERSISTENCIA ============
+# Directorio de la bitacora de operaciones (instantanea + registro). Sin configurar,
+# la aplicacion arranca vacia y no escribe nada en disco.
+DIRECTORIO_DATOS = os.environ.get("BIBMAGIC_DATOS") or None
+
 # ============ FUENTES ============
 FONT_TITLE_LARGE = ("Georgia", 26, "bold")
 FONT_TITLE_MEDIUM = ("Arial", 14, "bold")
@@ -142,25 +142,13 @@ class VisualizacionTab:
             return
         
         hash_table = biblioteca.catalogo_local.tabla_isbn
+        stats = hash_table.obtener_estadisticas()
         
-        colisiones = 0
-        max_cadena = 0
-        buckets_usados = 0
-        
-        for bucket in hash_table.tabla:
-            if bucket:
-                buckets_usados += 1
-                longitud = 0
-                actual = bucket
-                while actual:
-                    longitud += 1
-                    actual = actual.siguiente
-                if longitud > 1:
-                    colisiones += longitud - 1
-                max_cadena = max(max_cadena, longitud)
-        
-        factor_carga = hash_table.cantidad / hash_table.capacidad
-        buckets_vacios = hash_table.capacidad - buckets_usados
+        colisiones = stats["colisiones"]
+        max_cadena = stats["max_cadena"]
+        buckets_usados = stats["buckets_usados"]
+        factor_carga = stats["factor_carga"]
+        buckets_vacios = stats["buckets_vacios"]
         
         ventana_stats = tk.Toplevel()
         ventana_stats.title("Estadísticas Tabla Hash")
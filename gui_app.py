@@ -7,7 +7,7 @@ from tkinter import ttk
 
 from objetos.red_bibliotecas import RedBibliotecas
 
-from gui.config import WINDOW_TITLE, WINDOW_GEOMETRY, BG_COLOR, TITLE_COLOR, FONT_TITLE_LARGE
+from gui.config import WINDOW_TITLE, WINDOW_GEOMETRY, BG_COLOR, TITLE_COLOR, FONT_TITLE_LARGE, DIRECTORIO_DATOS
 from gui.styles import configurar_estilos
 from gui.dashboard_tab import crear_dashboard
 from gui.catalogo_tab import crear_catalogo_tab
@@ -19,11 +19,16 @@ from gui.pruebas_tab import crear_pruebas_carga_tab
 
 red_bibliotecas = None
 
-def iniciar_gui():
+def iniciar_gui(directorio_datos: str = None):
     """Iniciar la interfaz gráfica principal"""
     global red_bibliotecas
     
     red_bibliotecas = RedBibliotecas()
+    # Solo con un directorio configurado (--datos o BIBMAGIC_DATOS) se recupera la
+    # sesion anterior y se registra cada cambio; si no, se arranca vacio como siempre
+    directorio_datos = directorio_datos or DIRECTORIO_DATOS
+    if directorio_datos:
+        red_bibliotecas.activar_bitacora(directorio_datos)
     
     root = tk.Tk()
     root.title(WINDOW_TITLE)
@@ -62,6 +67,11 @@ def iniciar_gui():
     
     actualizar_ui()
     
+    def al_cerrar():
+        red_bibliotecas.cerrar_bitacora()
+        root.destroy()
+    
+    root.protocol("WM_DELETE_WINDOW", al_cerrar)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
+import argparse
 import sys
 from gui_app import iniciar_gui
 
 def main():
+    parser = argparse.ArgumentParser(description="Sistema de Gestión BibMagic")
+    parser.add_argument("--datos", metavar="DIRECTORIO",
+                        help="guarda la sesion en DIRECTORIO (instantanea + bitacora) y la recupera al iniciar")
+    args = parser.parse_args()
     try:
-        iniciar_gui()
+        iniciar_gui(args.datos)
     except Exception as e:
         print(f"Error al iniciar GUI: {e}")
         sys.exit(1)
@@ -236,7 +236,7 @@ class Menu:
         self.mostrar_separador()
         inicio = self.leer_entero("Ingrese anio inicial: ")
         fin = self.leer_entero("Ingrese anio final: ")
-        libros = self.bm.buscar_por_rango_fechas(inicio, fin)
+        libros = list(self.bm.iterar_rango_fechas(inicio, fin))
         for libro in libros:
             print(f"{libro.titulo} - {libro.autor} - {libro.genero} - {libro.anio} - {libro.isbn}")
         if not libros:
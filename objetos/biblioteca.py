@@ -3,6 +3,7 @@ from objetos.libro import Libro
 from objetos.inventario import Inventario
 from estructuras.cola import Cola
 from estructuras.pila import Pila
+from estructuras.diccionario_categorias import CATEGORIAS
 from estructuras.metodos_ordenamiento import comparar_metodos
 from typing import Optional, List
 import time
@@ -12,8 +13,8 @@ class Biblioteca:
     
     def __init__(self, id_biblioteca: str, nombre: str, ubicacion: str, 
                  tiempo_ingreso: int = 10, tiempo_traspaso: int = 5, intervalo_despacho: int = 3,
-                 inventario: Optional[Inventario] = None):
-        self.id = id_biblioteca
+                 inventario: Optional[Inventario] = None, catalogo: Optional[ControladorCatalogo] = None):
+        self.id = CATEGORIAS.canonico(id_biblioteca)
         self.nombre = nombre
         self.ubicacion = ubicacion
         
@@ -25,10 +26,13 @@ class Biblioteca:
         self.cola_traspaso = Cola(tipo="traspaso")
         self.cola_salida = Cola(tipo="salida")
         
-        self.catalogo_local = ControladorCatalogo()
+        # Un catalogo propio permite elegir el grado de sus arboles o el tipo de tabla hash
+        self.catalogo_local = catalogo or ControladorCatalogo()
         self.inventario = inventario
         
         self.pila_rollback = Pila()
+        # Bitacora de escritura anticipada de la red (opcional)
+        self.bitacora = None
         
         self.ultimo_despacho = time.time()
         
@@ -42,6 +46,13 @@ class Biblioteca:
     def set_inventario(self, inventario: Inventario) -> None:
         self.inventario = inventario
 
+    def set_bitacora(self, bitacora) -> None:
+        self.bitacora = bitacora
+
+    def _registrar(self, operacion: str, **datos) -> None:
+        if self.bitacora:
+            self.bitacora.registrar(operacion, biblioteca=self.id, **datos)
+
     def _actualizar_inventario(self, libro: Libro, delta: int) -> None:
         if not self.inventario:
             return
@@ -65,6 +76,25 @@ class Biblioteca:
             self.pila_rollback.apilar(operacion)
         if contar_ingreso:
             self.estadisticas["libros_ingresados"] += 1
+        self._registrar("agregar", libro=libro.a_dict(), contar_ingreso=contar_ingreso)
+
+    def agregar_libros_catalogo(self, libros: List[Libro], registrar_rollback: bool = True, contar_ingreso: bool = True,
+                                silencioso: bool = False) -> None:
+        for libro in libros:
+            libro.biblioteca_origen = libro.biblioteca_origen or self.id
+            if not libro.biblioteca_destino:
+                libro.biblioteca_destino = self.id
+            libro.cambiar_estado("disponible")
+        
+        self.catalogo_local.agregar_libros_lote(libros, silencioso=silencioso)
+        
+        for libro in libros:
+            self._actualizar_inventario(libro, 1)
+            if registrar_rollback:
+                self.pila_rollback.apilar({"tipo": "agregar", "libro": libro})
+        if contar_ingreso:
+            self.estadisticas["libros_ingresados"] += len(libros)
+        self._registrar("agregar_lote", libros=[libro.a_dict() for libro in libros], contar_ingreso=contar_ingreso)
 
     def actualizar_libro(self, isbn: str, nuevos_datos: dict, registrar_rollback: bool = True) -> bool:
         libro_original = self.obtener_libro_por_isbn(isbn)
@@ -91,6 +121,7 @@ class Biblioteca:
                 }
                 self.pila_rollback.apilar(operacion)
             
+            self._registrar("actualizar", isbn=isbn, datos=nuevos_datos)
             return True
         return False
 
@@ -154,14 +185,15 @@ class Biblioteca:
     def obtener_libro_por_isbn(self, isbn: str) -> Optional[Libro]:
         return self.catalogo_local.buscar_por_isbn(isbn)
 
-    def eliminar_libro_catalogo(self, isbn: str) -> bool:
+    def eliminar_libro_catalogo(self, isbn: str, silencioso: bool = False) -> bool:
         libro = self.obtener_libro_por_isbn(isbn)
         if libro:
             operacion = {"tipo": "eliminar", "libro": libro}
             self.pila_rollback.apilar(operacion)
             
-            self.catalogo_local.eliminar_libro(isbn)
+            self.catalogo_local.eliminar_libro(isbn, silencioso)
             self._actualizar_inventario(libro, -1)
+            self._registrar("eliminar", isbn=isbn)
             return True
         return False
 
@@ -175,12 +207,14 @@ class Biblioteca:
             libro = operacion["libro"]
             self.catalogo_local.eliminar_libro(libro.isbn)
             self._actualizar_inventario(libro, -1)
+            self._registrar("eliminar", isbn=libro.isbn)
             return f"Se deshizo la agregación de '{libro.titulo}'"
             
         elif operacion["tipo"] == "eliminar":
             libro = operacion["libro"]
             self.catalogo_local.agregar_libro(libro)
             self._actualizar_inventario(libro, 1)
+            self._registrar("restaurar", libro=libro.a_dict())
             return f"Se deshizo la eliminación de '{libro.titulo}'"
 
         elif operacion["tipo"] == "actualizar":
@@ -201,8 +235,33 @@ class Biblioteca:
                 "estado": libro_anterior.estado,
             }
             self.catalogo_local.actualizar_libro(libro_anterior.isbn, datos_restauracion)
+            self._registrar("actualizar", isbn=libro_anterior.isbn, datos=datos_restauracion)
             return f"Se deshizo la actualización de '{libro_anterior.titulo}'"
 
+    def aplicar_operacion(self, registro: dict) -> None:
+        """Repite una operacion leida de la bitacora (las del deshacer quedan como sus efectos)."""
+        operacion = registro["op"]
+        if operacion == "agregar":
+            self.agregar_libro_catalogo(Libro(**registro["libro"]), registrar_rollback=False,
+                                        contar_ingreso=registro["contar_ingreso"])
+        elif operacion == "agregar_lote":
+            self.agregar_libros_catalogo([Libro(**datos) for datos in registro["libros"]],
+                                         registrar_rollback=False, contar_ingreso=registro["contar_ingreso"],
+                                         silencioso=True)
+        elif operacion == "actualizar":
+            self.actualizar_libro(registro["isbn"], registro["datos"], registrar_rollback=False)
+        elif operacion == "eliminar":
+            libro = self.obtener_libro_por_isbn(registro["isbn"])
+            if libro:
+                self.catalogo_local.eliminar_libro(libro.isbn)
+                self._actualizar_inventario(libro, -1)
+        elif operacion == "restaurar":
+            libro = Libro(**registro["libro"])
+            self.catalogo_local.agregar_libro(libro)
+            self._actualizar_inventario(libro, 1)
+        else:
+            raise ValueError(f"Operacion de bitacora desconocida: {operacion}")
+
     def ordenar_catalogo(self, metodo: str = "quick_sort", clave: str = "titulo") -> None:
         from estructuras.metodos_ordenamiento import burbuja, seleccion, insercion, shell_sort, quick_sort
         
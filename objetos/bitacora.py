@@ -0,0 +1,122 @@
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import threading
+
+
+class BitacoraOperaciones:
+    """
+    Registro de escritura anticipada (write-ahead log) de la red: una operacion
+    por linea en JSON, solo agregando al final. Cada operacion pasa al sistema
+    operativo al registrarse, asi que una caida del proceso no pierde nada. El
+    fsync se confirma en grupo: cada `tamanio_grupo` operaciones, o por un
+    temporizador a los `intervalo_sincronizacion` segundos de la primera
+    operacion sin confirmar. Ante una caida del sistema se pierden a lo sumo las
+    operaciones del grupo abierto.
+    """
+
+    def __init__(self, ruta_archivo: str, secuencia_inicial: int = 0, tamanio_grupo: int = 32,
+                 intervalo_sincronizacion: float = 0.5, limite_compactacion: int = 5000):
+        self.ruta_archivo = ruta_archivo
+        self.tamanio_grupo = tamanio_grupo
+        self.intervalo_sincronizacion = intervalo_sincronizacion
+        self.limite_compactacion = limite_compactacion
+
+        registros, _ = self.leer(ruta_archivo)
+        self.secuencia = max([secuencia_inicial] + [r["seq"] for r in registros])
+        self.registros = len(registros)
+
+        self._archivo = open(ruta_archivo, "a", encoding="utf-8")
+        self._pendientes = 0
+        self._pausas = 0
+        # El temporizador confirma desde otro hilo: el candado ordena escrituras y fsync
+        self._candado = threading.Lock()
+        self._temporizador: Optional[threading.Timer] = None
+
+    @property
+    def activa(self) -> bool:
+        return self._archivo is not None and self._pausas == 0
+
+    @contextmanager
+    def pausar(self):
+        """Suspende el registro mientras una operacion compuesta ya quedo registrada entera."""
+        self._pausas += 1
+        try:
+            yield
+        finally:
+            self._pausas -= 1
+
+    def registrar(self, operacion: str, **datos) -> None:
+        if not self.activa:
+            return
+        with self._candado:
+            self.secuencia += 1
+            registro = {"seq": self.secuencia, "op": operacion, **datos}
+            self._archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            self._archivo.flush()
+            self.registros += 1
+            self._pendientes += 1
+            if self._pendientes >= self.tamanio_grupo:
+                self._sincronizar()
+            elif self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo_sincronizacion, self.sincronizar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def sincronizar(self) -> None:
+        with self._candado:
+            self._sincronizar()
+
+    def _sincronizar(self) -> None:
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        if self._archivo is None:
+            return
+        self._archivo.flush()
+        if self._pendientes:
+            os.fsync(self._archivo.fileno())
+        self._pendientes = 0
+
+    def necesita_compactar(self) -> bool:
+        return self.registros >= self.limite_compactacion
+
+    def truncar(self) -> None:
+        """Vacia el registro despues de guardar una instantanea (la secuencia continua)."""
+        with self._candado:
+            self._sincronizar()
+            self._archivo.close()
+            self._archivo = open(self.ruta_archivo, "w", encoding="utf-8")
+            os.fsync(self._archivo.fileno())
+            self.registros = 0
+
+    def cerrar(self) -> None:
+        with self._candado:
+            if self._archivo is None:
+                return
+            self._sincronizar()
+            self._archivo.close()
+            self._archivo = None
+
+    @staticmethod
+    def leer(ruta_archivo: str) -> Tuple[List[Dict], int]:
+        """
+        Lee las operaciones registradas. Una ultima linea incompleta (caida a mitad
+        de una escritura) se descarta; cualquier linea danada antes corta la lectura.
+        Retorna los registros y cuantas lineas se descartaron.
+        """
+        registros = []
+        descartadas = 0
+        if not os.path.exists(ruta_archivo):
+            return registros, descartadas
+        with open(ruta_archivo, "r", encoding="utf-8") as archivo:
+            for linea in archivo:
+                if descartadas:
+                    descartadas += 1
+                    continue
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    descartadas = 1
+        return registros, descartadas
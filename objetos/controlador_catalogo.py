@@ -1,5 +1,6 @@
 from pathlib import Path
 import csv
+import heapq
 import subprocess
 import time
 from typing import List, Optional, Dict
@@ -9,8 +10,10 @@ from estructuras.lista_libros import ListaLibros
 from estructuras.arbol_avl import ArbolAVL
 from estructuras.arbol_b import ArbolB
 from estructuras.tabla_hash import TablaHash
+from estructuras.tabla_hash_abierta import TablaHashAbierta
 from estructuras.arbol_bplus import ArbolBPlus
 from estructuras.pila import Pila
+from estructuras.diccionario_categorias import CATEGORIAS
 
 
 class Coleccion:
@@ -22,12 +25,15 @@ class Coleccion:
 
 
 class ControladorCatalogo:
-    def __init__(self):
+    def __init__(self, hash_abierto: bool = False, grado_fechas: int = 3, grado_generos: int = 2):
         self.lista_secuencial = ListaLibros()
         self.arbol_titulos = ArbolAVL()
-        self.arbol_fechas = ArbolB(3)
-        self.tabla_isbn = TablaHash()
-        self.arbol_generos = ArbolBPlus()
+        # Grados minimos de los arboles B y B+: con catalogos grandes conviene 64-256
+        # (arboles de pocos niveles con busqueda binaria dentro de cada nodo)
+        self.arbol_fechas = ArbolB(grado_fechas)
+        # hash_abierto usa direccionamiento abierto (menos memoria por libro en catalogos grandes)
+        self.tabla_isbn = TablaHashAbierta() if hash_abierto else TablaHash()
+        self.arbol_generos = ArbolBPlus(grado_generos)
         self.colecciones: Dict[str, Coleccion] = {}
         self.pila_operaciones = Pila()
         self.pila_devoluciones = Pila()
@@ -86,7 +92,84 @@ class ControladorCatalogo:
         self.pila_operaciones.push(("agregar", libro))
 
         print(f"Libro agregado a colección '{nombre_coleccion}': {libro.titulo}")
-   
+
+    def agregar_libros_lote(self, libros: List[Libro], nombre_coleccion: str = "General",
+                            silencioso: bool = False) -> int:
+        """
+        Agrega muchos libros de una vez con el mismo resultado que llamar a
+        agregar_libro con cada uno. Cuando el lote es grande frente al catalogo, los
+        arboles se reconstruyen desde entradas ordenadas en lugar de insertar libro
+        por libro, y la tabla hash se dimensiona una sola vez.
+        Retorna la cantidad de libros aceptados.
+        """
+        aceptados: List[Libro] = []
+        for libro in libros:
+            if not libro.titulo or not libro.autor or not libro.genero:
+                continue
+            if libro.anio < 1000 or libro.anio > 2025:
+                continue
+            if any(col_nombre != nombre_coleccion and libro.isbn in col.isbns_en_coleccion
+                   for col_nombre, col in self.colecciones.items()):
+                continue
+            aceptados.append(libro)
+
+        if not aceptados:
+            return 0
+
+        if nombre_coleccion not in self.colecciones:
+            self.colecciones[nombre_coleccion] = Coleccion(nombre_coleccion)
+        coleccion = self.colecciones[nombre_coleccion]
+
+        existentes = self.lista_secuencial.tamanio
+        for libro in aceptados:
+            coleccion.libros.insertar(libro)
+            coleccion.isbns_en_coleccion.add(libro.isbn)
+            self.lista_secuencial.insertar(libro)
+            self.pila_operaciones.push(("agregar", libro))
+
+        self.tabla_isbn.reservar(self.tabla_isbn.cantidad + len(aceptados))
+        for libro in aceptados:
+            self.tabla_isbn.insertar(libro)
+
+        if len(aceptados) * 4 < existentes:
+            # Lote chico frente al catalogo: reconstruir costaria mas que insertar
+            for libro in aceptados:
+                self.arbol_titulos.insertar(libro)
+                self.arbol_fechas.insertar(libro)
+                self.arbol_generos.insertar(libro)
+        else:
+            self._reconstruir_arboles(aceptados)
+
+        if not silencioso:
+            print(f"{len(aceptados)} libros agregados a colección '{nombre_coleccion}'")
+        return len(aceptados)
+
+    def _reconstruir_arboles(self, nuevos: List[Libro]) -> None:
+        # Solo se ordena el lote; los arboles ya entregan lo existente en orden y se
+        # mezcla en O(n) antes de construir de abajo hacia arriba
+        clave_titulo = lambda libro: (libro.titulo, libro.isbn)
+        clave_fecha = lambda libro: (libro.anio, libro.isbn)
+
+        # AVL: todas las ediciones de cada titulo; un ISBN repetido reemplaza al anterior
+        # (merge pone primero lo existente y sorted es estable: gana el ultimo del lote)
+        ordenados: List[Libro] = []
+        for libro in heapq.merge(self.arbol_titulos.iterar(), sorted(nuevos, key=clave_titulo), key=clave_titulo):
+            if ordenados and clave_titulo(ordenados[-1]) == clave_titulo(libro):
+                ordenados[-1] = libro
+            else:
+                ordenados.append(libro)
+        self.arbol_titulos.construir_desde_ordenados(ordenados)
+
+        # B: mismo orden (anio, isbn) que usa la insercion
+        self.arbol_fechas.construir_desde_ordenados(list(heapq.merge(
+            self.arbol_fechas.inorder(), sorted(nuevos, key=clave_fecha), key=clave_fecha)))
+
+        # B+: cada genero conserva sus libros en orden, sin ISBN repetidos
+        grupos = self.arbol_generos.obtener_grupos()
+        for libro in nuevos:
+            grupos.setdefault(libro.genero, {}).setdefault(libro.isbn, libro)
+        self.arbol_generos.construir_desde_ordenados(sorted(grupos.items()))
+
     
     
     
@@ -115,11 +198,13 @@ class ControladorCatalogo:
         
         for campo, valor in nuevos_datos.items():
             if hasattr(libro_actual, campo):
+                if campo in Libro.CAMPOS_CATEGORICOS:
+                    valor = CATEGORIAS.canonico(valor)
                 setattr(libro_actual, campo, valor)
         
 
         if 'titulo' in nuevos_datos and nuevos_datos['titulo'] != titulo_anterior:
-            self.arbol_titulos.eliminar(titulo_anterior)
+            self.arbol_titulos.eliminar(titulo_anterior, isbn)
             self.arbol_titulos.insertar(libro_actual)
         
         if 'genero' in nuevos_datos and nuevos_datos['genero'] != genero_anterior:
@@ -142,10 +227,11 @@ class ControladorCatalogo:
     
     
 
-    def eliminar_libro(self, isbn: str) -> None:
+    def eliminar_libro(self, isbn: str, silencioso: bool = False) -> None:
         libro = self.tabla_isbn.buscar(isbn)
         if not libro:
-            print(f"Libro con ISBN {isbn} no encontrado.")
+            if not silencioso:
+                print(f"Libro con ISBN {isbn} no encontrado.")
             return
 
         self.pila_operaciones.push(("eliminar", libro))
@@ -160,7 +246,7 @@ class ControladorCatalogo:
                 col.isbns_en_coleccion.discard(isbn) 
 
         self.lista_secuencial.eliminar(isbn)
-        self.arbol_titulos.eliminar(titulo)
+        self.arbol_titulos.eliminar(titulo, isbn)
         self.tabla_isbn.eliminar(isbn)
         
         try:
@@ -172,7 +258,8 @@ class ControladorCatalogo:
         except TypeError:
             self.arbol_generos.eliminar(genero)
 
-        print(f"Libro eliminado correctamente: {titulo}")
+        if not silencioso:
+            print(f"Libro eliminado correctamente: {titulo}")
 
     # -----------------------
     # Búsquedas / Listados
@@ -180,6 +267,9 @@ class ControladorCatalogo:
     def buscar_por_titulo(self, titulo: str) -> Optional[Libro]:
         return self.arbol_titulos.buscar(titulo)
 
+    def buscar_todos_por_titulo(self, titulo: str) -> List[Libro]:
+        return self.arbol_titulos.buscar_todos(titulo)
+
     def buscar_por_isbn(self, isbn: str) -> Optional[Libro]:
         return self.tabla_isbn.buscar(isbn)
 
@@ -192,6 +282,13 @@ class ControladorCatalogo:
     def buscar_por_genero(self, genero: str) -> List[Libro]:
         return self.arbol_generos.buscar(genero)
 
+    def iterar_rango_generos(self, desde: str, hasta: str):
+        """Libros con genero entre `desde` y `hasta`, recorriendo solo esas hojas del B+."""
+        return self.arbol_generos.rango(desde, hasta)
+
+    def buscar_por_prefijo_genero(self, prefijo: str):
+        return self.arbol_generos.prefijo(prefijo)
+
     def buscar_por_rango_fechas(self, inicio: int, fin: int):
         if hasattr(self.arbol_fechas, "buscar_por_rango_fechas"):
             return self.arbol_fechas.buscar_por_rango_fechas(inicio, fin)
@@ -200,9 +297,25 @@ class ControladorCatalogo:
             resultados.extend(self.buscar_por_fecha(anio))
         return resultados
 
+    def iterar_rango_fechas(self, inicio: int, fin: int, limite: Optional[int] = None, desplazamiento: int = 0):
+        """Libros del rango de anios en orden, de forma perezosa y paginable."""
+        return self.arbol_fechas.rango(inicio, fin, limite, desplazamiento)
+
+    def contar_rango_fechas(self, inicio: int, fin: int) -> int:
+        return self.arbol_fechas.contar_rango(inicio, fin)
+
     def listar_por_titulo_ordenado(self) -> List[Libro]:
         return self.arbol_titulos.inorder()
 
+    def iterar_por_titulo(self, desde: Optional[str] = None, hasta: Optional[str] = None):
+        """Recorre el catalogo por titulo de forma perezosa (para paginar sin copiar)."""
+        if desde is None and hasta is None:
+            return self.arbol_titulos.iterar()
+        return self.arbol_titulos.rango(desde or "", hasta if hasta is not None else "\U0010ffff")
+
+    def buscar_por_prefijo_titulo(self, prefijo: str):
+        return self.arbol_titulos.prefijo(prefijo)
+
     def obtener_generos_unicos(self) -> List[str]:
         return self.arbol_generos.obtener_generos()
 
@@ -227,7 +340,7 @@ class ControladorCatalogo:
                     col.isbns_en_coleccion.discard(libro.isbn)
             
             self.lista_secuencial.eliminar(libro.isbn)
-            self.arbol_titulos.eliminar(libro.titulo)
+            self.arbol_titulos.eliminar(libro.titulo, libro.isbn)
             self.tabla_isbn.eliminar(libro.isbn)
             try:
                 self.arbol_fechas.eliminar(libro.anio, libro.isbn)
@@ -290,6 +403,8 @@ class ControladorCatalogo:
             return 0
 
         contador = 0
+        por_catalogo: Dict[int, tuple] = {}
+        solicitudes = []
 
         try:
             with open(ruta_archivo, "r", encoding="utf-8") as archivo:
@@ -331,18 +446,24 @@ class ControladorCatalogo:
                         )
                         
                         if red_bibliotecas and id_origen in red_bibliotecas.bibliotecas:
-                            red_bibliotecas.bibliotecas[id_origen].catalogo_local.agregar_libro(libro, nombre_coleccion)
+                            catalogo = red_bibliotecas.bibliotecas[id_origen].catalogo_local
                             
                             if id_destino and id_destino != id_origen and id_destino in red_bibliotecas.bibliotecas:
-                                red_bibliotecas.programar_transferencia(libro.isbn, id_origen, id_destino, prioridad)
+                                solicitudes.append((libro.isbn, id_origen, id_destino, prioridad))
                         else:
-                            self.agregar_libro(libro, nombre_coleccion)
+                            catalogo = self
+                        por_catalogo.setdefault(id(catalogo), (catalogo, []))[1].append(libro)
                         
                         contador += 1
                         
                     except Exception: 
                         continue
 
+            for catalogo, libros in por_catalogo.values():
+                catalogo.agregar_libros_lote(libros, nombre_coleccion)
+            if solicitudes:
+                red_bibliotecas.iniciar_transferencias_lote(solicitudes)
+
             print(f"\nCarga completada: {contador} libros importados")
             return contador
             
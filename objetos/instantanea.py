@@ -0,0 +1,416 @@
+from array import array
+from typing import Dict, List, Optional
+import math
+import mmap
+import os
+import struct
+import sys
+
+from objetos.biblioteca import Biblioteca
+from objetos.controlador_catalogo import Coleccion, ControladorCatalogo
+from estructuras.tabla_hash_abierta import TablaHashAbierta
+from objetos.libro import Libro
+from objetos.transferencia import Transferencia
+
+# -------------------------------------------------
+# Formato
+# -------------------------------------------------
+# Cabecera: magia, version, orden de bytes y cantidad de secciones.
+# Tabla de secciones: nombre (8 bytes), desplazamiento y longitud.
+# Cada seccion es una serie de columnas: (tipo, cantidad) y los datos crudos del
+# arreglo, alineados a 8 bytes, de modo que se leen sin copiar desde un mmap.
+# Los textos van en la seccion CADENAS y las demas columnas guardan su indice.
+MAGIA = b"RBIN"
+VERSION = 1
+_CABECERA = struct.Struct("<4sHcxI")
+_ENTRADA_SECCION = struct.Struct("<8sQQ")
+_CABECERA_COLUMNA = struct.Struct("<c7xQ")
+
+_ORDEN_BYTES = b"<" if sys.byteorder == "little" else b">"
+
+# Posicion de cada cola en la seccion COLAS
+_COLAS = ("cola_ingreso", "cola_traspaso", "cola_salida")
+
+
+class EscritorInstantanea:
+    """Arma las secciones en memoria y las escribe con su tabla al final."""
+
+    def __init__(self):
+        self.secciones: Dict[str, List[array]] = {}
+        self.cadenas: List[str] = []
+        self._ids_cadenas: Dict[str, int] = {}
+
+    def cadena(self, texto: Optional[str]) -> int:
+        texto = texto or ""
+        indice = self._ids_cadenas.get(texto)
+        if indice is None:
+            indice = self._ids_cadenas[texto] = len(self.cadenas)
+            self.cadenas.append(texto)
+        return indice
+
+    def seccion(self, nombre: str, *columnas: array) -> None:
+        self.secciones[nombre] = list(columnas)
+
+    def escribir(self, ruta_archivo: str) -> None:
+        datos = bytearray()
+        desplazamientos = array("Q", [0])
+        for texto in self.cadenas:
+            datos += texto.encode("utf-8")
+            desplazamientos.append(len(datos))
+        self.seccion("CADENAS", desplazamientos, array("B", datos))
+
+        cuerpos = []
+        for nombre, columnas in self.secciones.items():
+            cuerpo = bytearray()
+            for columna in columnas:
+                cuerpo += _CABECERA_COLUMNA.pack(columna.typecode.encode("ascii"), len(columna))
+                cuerpo += columna.tobytes()
+                cuerpo += bytes(-len(cuerpo) % 8)
+            cuerpos.append((nombre, cuerpo))
+
+        posicion = _CABECERA.size + _ENTRADA_SECCION.size * len(cuerpos)
+        posicion += -posicion % 8
+        temporal = ruta_archivo + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(_CABECERA.pack(MAGIA, VERSION, _ORDEN_BYTES, len(cuerpos)))
+            for nombre, cuerpo in cuerpos:
+                archivo.write(_ENTRADA_SECCION.pack(nombre.encode("ascii"), posicion, len(cuerpo)))
+                posicion += len(cuerpo)
+            archivo.write(bytes(-archivo.tell() % 8))
+            for _, cuerpo in cuerpos:
+                archivo.write(cuerpo)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        # Reemplazo atomico: nunca queda una instantanea a medio escribir
+        os.replace(temporal, ruta_archivo)
+
+
+class LectorInstantanea:
+    """
+    Abre una instantanea con mmap y decodifica cada seccion recien al pedirla.
+    Las columnas numericas son vistas sobre el archivo (sin copia) y los textos
+    se decodifican uno a uno cuando se consultan.
+    """
+
+    def __init__(self, ruta_archivo: str):
+        self._archivo = open(ruta_archivo, "rb")
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._vista = memoryview(self._mapa)
+
+        magia, version, orden, cantidad = _CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA:
+            self.cerrar()
+            raise ValueError("El archivo no es una instantanea de la red")
+        if version != VERSION:
+            self.cerrar()
+            raise ValueError(f"Version de instantanea no soportada: {version}")
+        if orden != _ORDEN_BYTES:
+            self.cerrar()
+            raise ValueError("La instantanea fue escrita con otro orden de bytes")
+
+        self._tabla: Dict[str, tuple] = {}
+        for i in range(cantidad):
+            nombre, inicio, longitud = _ENTRADA_SECCION.unpack_from(
+                self._mapa, _CABECERA.size + i * _ENTRADA_SECCION.size)
+            self._tabla[nombre.rstrip(b"\0").decode("ascii")] = (inicio, longitud)
+        self._columnas: Dict[str, List[memoryview]] = {}
+        self._cadenas: Dict[int, str] = {}
+
+    def secciones(self) -> List[str]:
+        return list(self._tabla)
+
+    def columnas(self, nombre: str) -> List[memoryview]:
+        if nombre not in self._columnas:
+            inicio, longitud = self._tabla[nombre]
+            fin = inicio + longitud
+            columnas = []
+            while inicio < fin:
+                tipo, cantidad = _CABECERA_COLUMNA.unpack_from(self._mapa, inicio)
+                inicio += _CABECERA_COLUMNA.size
+                tipo = tipo.decode("ascii")
+                tamanio = cantidad * array(tipo).itemsize
+                columnas.append(self._vista[inicio:inicio + tamanio].cast(tipo))
+                inicio += tamanio + (-tamanio % 8)
+            self._columnas[nombre] = columnas
+        return self._columnas[nombre]
+
+    def cadena(self, indice: int) -> str:
+        texto = self._cadenas.get(indice)
+        if texto is None:
+            desplazamientos, datos = self.columnas("CADENAS")
+            texto = str(datos[desplazamientos[indice]:desplazamientos[indice + 1]], "utf-8")
+            self._cadenas[indice] = texto
+        return texto
+
+    def cerrar(self) -> None:
+        self._columnas.clear()
+        self._vista.release()
+        self._mapa.close()
+        self._archivo.close()
+
+
+# -------------------------------------------------
+# Guardar
+# -------------------------------------------------
+def guardar(red, ruta_archivo: str, secuencia_bitacora: int = 0) -> None:
+    """
+    Escribe el estado de la red: grafo, bibliotecas, catalogos, colas,
+    transferencias e inventario. Las pilas de deshacer no se guardan.
+    `secuencia_bitacora` es la ultima operacion de la bitacora ya incluida.
+    """
+    escritor = EscritorInstantanea()
+    cadena = escritor.cadena
+    escritor.seccion("BITACORA", array("Q", [secuencia_bitacora]))
+
+    # Libros: cada objeto una sola vez, referenciado por su posicion
+    ids_libros: Dict[int, int] = {}
+    libros: List[Libro] = []
+
+    def indice_libro(libro: Libro) -> int:
+        indice = ids_libros.get(id(libro))
+        if indice is None:
+            indice = ids_libros[id(libro)] = len(libros)
+            libros.append(libro)
+        return indice
+
+    # Bibliotecas
+    columnas_bib = [array("I") for _ in range(3)] + [array("q") for _ in range(6)] + [array("d")]
+    # Configuracion de cada catalogo: grado del arbol B, grado del B+ y tipo de tabla hash
+    columnas_config = [array("q"), array("q"), array("B")]
+    catalogo_desp, catalogo_libros, catalogo_colecciones = array("I", [0]), array("I"), array("I")
+    colecciones_desp, colecciones_nombre, colecciones_desc = array("I", [0]), array("I"), array("I")
+    colas_desp, colas_libros = array("I", [0]), array("I")
+    for biblioteca in red.bibliotecas.values():
+        valores = (
+            cadena(biblioteca.id), cadena(biblioteca.nombre), cadena(biblioteca.ubicacion),
+            biblioteca.tiempo_ingreso, biblioteca.tiempo_traspaso, biblioteca.intervalo_despacho,
+            biblioteca.estadisticas["libros_ingresados"], biblioteca.estadisticas["libros_enviados"],
+            biblioteca.estadisticas["libros_recibidos"], biblioteca.estadisticas["tiempo_total_procesamiento"],
+        )
+        for columna, valor in zip(columnas_bib, valores):
+            columna.append(valor)
+
+        catalogo = biblioteca.catalogo_local
+        configuracion = (catalogo.arbol_fechas.t, catalogo.arbol_generos.t,
+                         isinstance(catalogo.tabla_isbn, TablaHashAbierta))
+        for columna, valor in zip(columnas_config, configuracion):
+            columna.append(valor)
+        coleccion_de: Dict[str, str] = {}
+        for nombre, coleccion in catalogo.colecciones.items():
+            colecciones_nombre.append(cadena(nombre))
+            colecciones_desc.append(cadena(coleccion.descripcion))
+            for isbn in coleccion.isbns_en_coleccion:
+                coleccion_de[isbn] = nombre
+        # La lista secuencial inserta al frente: se guarda en orden de insercion
+        en_orden = []
+        actual = catalogo.lista_secuencial.cabeza
+        while actual:
+            en_orden.append(actual.data)
+            actual = actual.siguiente
+        for libro in reversed(en_orden):
+            catalogo_libros.append(indice_libro(libro))
+            catalogo_colecciones.append(cadena(coleccion_de.get(libro.isbn, "General")))
+        catalogo_desp.append(len(catalogo_libros))
+        colecciones_desp.append(len(colecciones_nombre))
+
+        for nombre_cola in _COLAS:
+            actual = getattr(biblioteca, nombre_cola).frente
+            while actual:
+                colas_libros.append(indice_libro(actual.libro))
+                actual = actual.siguiente
+            colas_desp.append(len(colas_libros))
+
+    escritor.seccion("BIBLIOS", *columnas_bib, *columnas_config)
+    escritor.seccion("CATALOGO", catalogo_desp, catalogo_libros, catalogo_colecciones)
+    escritor.seccion("COLECC", colecciones_desp, colecciones_nombre, colecciones_desc)
+    escritor.seccion("COLAS", colas_desp, colas_libros)
+
+    # Grafo: nodos con etiqueta y coordenadas (NaN si no tiene), aristas dirigidas en su orden
+    grafo = red.grafo
+    nombres_nodos = list(grafo.nodos)
+    posicion_nodo = {nombre: i for i, nombre in enumerate(nombres_nodos)}
+    nodos_nombre, nodos_etiqueta, latitudes, longitudes = array("I"), array("I"), array("d"), array("d")
+    aristas_origen, aristas_destino, aristas_tiempo, aristas_costo = array("I"), array("I"), array("q"), array("d")
+    for nombre in nombres_nodos:
+        nodos_nombre.append(cadena(nombre))
+        nodos_etiqueta.append(cadena(grafo.etiquetas.get(nombre)))
+        latitud, longitud = grafo.coordenadas.get(nombre, (math.nan, math.nan))
+        latitudes.append(latitud)
+        longitudes.append(longitud)
+        for arista in grafo.nodos[nombre]:
+            aristas_origen.append(posicion_nodo[nombre])
+            aristas_destino.append(posicion_nodo[arista.destino])
+            aristas_tiempo.append(int(arista.tiempo))
+            aristas_costo.append(float(arista.costo))
+    escritor.seccion("NODOS", nodos_nombre, nodos_etiqueta, latitudes, longitudes)
+    escritor.seccion("ARISTAS", aristas_origen, aristas_destino, aristas_tiempo, aristas_costo)
+
+    # Transferencias activas y completadas
+    transferencias = [(t, 0) for t in red.transferencias_por_isbn.values()]
+    transferencias += [(t, 1) for t in red.transferencias_completadas]
+    columnas_trans = [array("I") for _ in range(5)] + [array("B"), array("q")] + [array("d") for _ in range(4)]
+    ruta_desp, ruta_nodos, segmento_tiempo, segmento_costo = array("I", [0]), array("I"), array("d"), array("d")
+    for transferencia, completada in transferencias:
+        valores = (
+            indice_libro(transferencia.libro), cadena(transferencia.origen), cadena(transferencia.destino),
+            cadena(transferencia.prioridad), cadena(transferencia.estado), completada,
+            transferencia.indice_segmento, transferencia.tiempo_total, transferencia.tiempo_recorrido,
+            transferencia.costo_total, transferencia.costo_recorrido,
+        )
+        for columna, valor in zip(columnas_trans, valores):
+            columna.append(valor)
+        ruta_nodos.extend(cadena(nodo) for nodo in transferencia.ruta)
+        ruta_desp.append(len(ruta_nodos))
+        for segmento in transferencia.segmentos:
+            segmento_tiempo.append(float(segmento["tiempo"]))
+            segmento_costo.append(float(segmento["costo"]))
+    escritor.seccion("TRANSF", *columnas_trans, ruta_desp, ruta_nodos, segmento_tiempo, segmento_costo)
+
+    # Libros por columnas (al final: las secciones anteriores ya registraron todos)
+    columnas_libro = [array("I") for _ in range(8)] + [array("q")]
+    for libro in libros:
+        valores = (
+            cadena(libro.titulo), cadena(libro.isbn), cadena(libro.genero), cadena(libro.autor),
+            cadena(libro.estado), cadena(libro.biblioteca_origen), cadena(libro.biblioteca_destino),
+            cadena(libro.prioridad), libro.anio,
+        )
+        for columna, valor in zip(columnas_libro, valores):
+            columna.append(valor)
+    escritor.seccion("LIBROS", *columnas_libro)
+
+    # Inventario: matriz bibliotecas x generos por filas
+    inventario = red.inventario_global
+    matriz = array("q")
+    for fila in inventario.matriz:
+        matriz.extend(fila)
+    escritor.seccion("INVENT",
+                     array("I", (cadena(b) for b in inventario.bibliotecas)),
+                     array("I", (cadena(g) for g in inventario.generos)),
+                     matriz)
+
+    escritor.escribir(ruta_archivo)
+
+
+# -------------------------------------------------
+# Cargar
+# -------------------------------------------------
+def cargar(red, ruta_archivo: str) -> int:
+    """
+    Reconstruye en `red` (vacia) el estado guardado con guardar(). Retorna la
+    secuencia de bitacora incluida en la instantanea.
+    """
+    lector = LectorInstantanea(ruta_archivo)
+    try:
+        _cargar(red, lector)
+        if "BITACORA" not in lector.secciones():
+            return 0
+        return lector.columnas("BITACORA")[0][0]
+    finally:
+        lector.cerrar()
+
+
+def _cargar(red, lector: LectorInstantanea) -> None:
+    cadena = lector.cadena
+
+    titulos, isbns, generos, autores, estados, origenes, destinos, prioridades, anios = lector.columnas("LIBROS")
+    libros = [
+        Libro(
+            titulo=cadena(titulos[i]), isbn=cadena(isbns[i]), genero=cadena(generos[i]),
+            anio=anios[i], autor=cadena(autores[i]), estado=cadena(estados[i]),
+            biblioteca_origen=cadena(origenes[i]), biblioteca_destino=cadena(destinos[i]),
+            prioridad=cadena(prioridades[i])
+        )
+        for i in range(len(isbns))
+    ]
+
+    # Grafo primero: _registrar_biblioteca solo agrega nodos que falten
+    nombres, etiquetas, latitudes, longitudes = lector.columnas("NODOS")
+    nombres_nodos = [cadena(i) for i in nombres]
+    for i, nombre in enumerate(nombres_nodos):
+        red.grafo.agregar_nodo(nombre, cadena(etiquetas[i]) or None)
+    aristas_origen, aristas_destino, aristas_tiempo, aristas_costo = lector.columnas("ARISTAS")
+    for i in range(len(aristas_origen)):
+        red.grafo.agregar_arista(nombres_nodos[aristas_origen[i]], nombres_nodos[aristas_destino[i]],
+                                 aristas_tiempo[i], aristas_costo[i], bidireccional=False)
+
+    columnas_bib = lector.columnas("BIBLIOS")
+    grados_fechas, grados_generos, hash_abierto = columnas_bib[10:]
+    catalogo_desp, catalogo_libros, catalogo_colecciones = lector.columnas("CATALOGO")
+    colecciones_desp, colecciones_nombre, colecciones_desc = lector.columnas("COLECC")
+    colas_desp, colas_libros = lector.columnas("COLAS")
+    for i in range(len(columnas_bib[0])):
+        (id_bib, nombre, ubicacion, t_ingreso, t_traspaso, intervalo,
+         ingresados, enviados, recibidos, tiempo_proc) = (columna[i] for columna in columnas_bib[:10])
+        catalogo = ControladorCatalogo(bool(hash_abierto[i]), grados_fechas[i], grados_generos[i])
+        biblioteca = Biblioteca(cadena(id_bib), cadena(nombre), cadena(ubicacion),
+                                t_ingreso, t_traspaso, intervalo, catalogo=catalogo)
+        red._registrar_biblioteca(biblioteca)
+        biblioteca.estadisticas.update({
+            "libros_ingresados": ingresados,
+            "libros_enviados": enviados,
+            "libros_recibidos": recibidos,
+            "tiempo_total_procesamiento": tiempo_proc,
+        })
+
+        # Las colecciones se crean antes para conservar su orden y las que quedaron vacias
+        for j in range(colecciones_desp[i], colecciones_desp[i + 1]):
+            nombre_coleccion = cadena(colecciones_nombre[j])
+            biblioteca.catalogo_local.colecciones[nombre_coleccion] = Coleccion(
+                nombre_coleccion, cadena(colecciones_desc[j]))
+
+        # Tramos consecutivos de la misma coleccion van en una sola carga masiva
+        inicio, fin = catalogo_desp[i], catalogo_desp[i + 1]
+        while inicio < fin:
+            coleccion = catalogo_colecciones[inicio]
+            tramo = inicio
+            while tramo < fin and catalogo_colecciones[tramo] == coleccion:
+                tramo += 1
+            biblioteca.catalogo_local.agregar_libros_lote(
+                [libros[j] for j in catalogo_libros[inicio:tramo]], cadena(coleccion), silencioso=True)
+            inicio = tramo
+
+        for k, nombre_cola in enumerate(_COLAS):
+            posicion = i * len(_COLAS) + k
+            cola = getattr(biblioteca, nombre_cola)
+            for j in colas_libros[colas_desp[posicion]:colas_desp[posicion + 1]]:
+                cola.encolar(libros[j])
+
+    # Coordenadas guardadas (pueden venir de asignar_coordenadas, no solo de la ubicacion)
+    for i, nombre in enumerate(nombres_nodos):
+        if not math.isnan(latitudes[i]):
+            red.grafo.asignar_coordenadas(nombre, latitudes[i], longitudes[i])
+
+    (libro_t, origen_t, destino_t, prioridad_t, estado_t, completada_t, indice_t,
+     tiempo_total, tiempo_recorrido, costo_total, costo_recorrido,
+     ruta_desp, ruta_nodos, segmento_tiempo, segmento_costo) = lector.columnas("TRANSF")
+    segmento = 0
+    for i in range(len(libro_t)):
+        transferencia = Transferencia(libros[libro_t[i]], cadena(origen_t[i]),
+                                      cadena(destino_t[i]), cadena(prioridad_t[i]))
+        transferencia.estado = cadena(estado_t[i])
+        transferencia.indice_segmento = indice_t[i]
+        transferencia.tiempo_total = tiempo_total[i]
+        transferencia.tiempo_recorrido = tiempo_recorrido[i]
+        transferencia.costo_total = costo_total[i]
+        transferencia.costo_recorrido = costo_recorrido[i]
+        transferencia.ruta = [cadena(j) for j in ruta_nodos[ruta_desp[i]:ruta_desp[i + 1]]]
+        for inicio, fin in zip(transferencia.ruta, transferencia.ruta[1:]):
+            transferencia.segmentos.append({
+                "origen": inicio,
+                "destino": fin,
+                "tiempo": segmento_tiempo[segmento],
+                "costo": segmento_costo[segmento],
+            })
+            segmento += 1
+        if completada_t[i]:
+            red.transferencias_completadas.append(transferencia)
+        else:
+            red.transferencias_por_isbn[transferencia.libro.isbn] = transferencia
+
+    ids_bib, ids_gen, matriz = lector.columnas("INVENT")
+    columnas = len(ids_gen)
+    red.inventario_global.importar_desde_dict({
+        "bibliotecas": [cadena(i) for i in ids_bib],
+        "generos": [cadena(i) for i in ids_gen],
+        "matriz": [list(matriz[f * columnas:(f + 1) * columnas]) for f in range(len(ids_bib))],
+    })
@@ -1,4 +1,5 @@
 from typing import Dict, List, Optional
+from estructuras.diccionario_categorias import CATEGORIAS
 
 
 class Inventario:
@@ -15,7 +16,7 @@ class Inventario:
             print(f"Biblioteca '{id_biblioteca}' ya existe en el inventario")
             return
         
-        self.bibliotecas.append(id_biblioteca)
+        self.bibliotecas.append(CATEGORIAS.canonico(id_biblioteca))
         idx = len(self.bibliotecas) - 1
         self.mapa_bibliotecas[id_biblioteca] = idx
         
@@ -27,7 +28,7 @@ class Inventario:
         if nombre_genero in self.mapa_generos:
             return
         
-        self.generos.append(nombre_genero)
+        self.generos.append(CATEGORIAS.canonico(nombre_genero))
         idx = len(self.generos) - 1
         self.mapa_generos[nombre_genero] = idx
         
@@ -181,8 +182,8 @@ class Inventario:
         }
 
     def importar_desde_dict(self, datos: Dict) -> None:
-        self.bibliotecas = datos["bibliotecas"]
-        self.generos = datos["generos"]
+        self.bibliotecas = CATEGORIAS.canonicos(datos["bibliotecas"])
+        self.generos = CATEGORIAS.canonicos(datos["generos"])
         self.matriz = datos["matriz"]
         
         self.mapa_bibliotecas = {bib: i for i, bib in enumerate(self.bibliotecas)}
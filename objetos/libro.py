@@ -1,4 +1,13 @@
+from estructuras.diccionario_categorias import CATEGORIAS
+
+
 class Libro:
+    # Sin __dict__ por instancia: cada libro ocupa mucho menos en redes grandes
+    __slots__ = ("titulo", "isbn", "genero", "anio", "autor", "estado",
+                 "biblioteca_origen", "biblioteca_destino", "prioridad")
+    # Campos con pocos valores distintos: se guardan como el valor canonico de CATEGORIAS
+    CAMPOS_CATEGORICOS = ("genero", "estado", "biblioteca_origen", "biblioteca_destino", "prioridad")
+
     def __init__(self, titulo="", isbn="", genero="", anio=0, autor="", 
                  estado="disponible", biblioteca_origen="", biblioteca_destino="", prioridad="tiempo"):
         
@@ -13,13 +22,22 @@ class Libro:
         
         self.titulo = titulo
         self.isbn = isbn
-        self.genero = genero
+        self.genero = CATEGORIAS.canonico(genero)
         self.anio = anio
         self.autor = autor
-        self.estado = estado
-        self.biblioteca_origen = biblioteca_origen
-        self.biblioteca_destino = biblioteca_destino
-        self.prioridad = prioridad
+        self.estado = CATEGORIAS.canonico(estado)
+        self.biblioteca_origen = CATEGORIAS.canonico(biblioteca_origen)
+        self.biblioteca_destino = CATEGORIAS.canonico(biblioteca_destino)
+        self.prioridad = CATEGORIAS.canonico(prioridad)
+
+    def __setstate__(self, estado):
+        # Un libro que vuelve de otro proceso (pickle) trae sus propias copias de los
+        # campos categoricos: se reemplazan por los canonicos de este proceso
+        _, campos = estado
+        for campo, valor in campos.items():
+            if campo in self.CAMPOS_CATEGORICOS:
+                valor = CATEGORIAS.canonico(valor)
+            setattr(self, campo, valor)
 
     def _validar_isbn(self, isbn: str) -> bool:
         isbn_limpio = "".join(ch for ch in isbn if ch.isdigit())
@@ -42,10 +60,23 @@ class Libro:
         )
     
 
+    def a_dict(self) -> dict:
+        return {
+            "titulo": self.titulo,
+            "isbn": self.isbn,
+            "genero": self.genero,
+            "anio": self.anio,
+            "autor": self.autor,
+            "estado": self.estado,
+            "biblioteca_origen": self.biblioteca_origen,
+            "biblioteca_destino": self.biblioteca_destino,
+            "prioridad": self.prioridad
+        }
+
     def cambiar_estado(self, nuevo_estado: str):
         estados_validos = ["disponible", "en_transito", "prestado", "agotado"]
         if nuevo_estado in estados_validos:
-            self.estado = nuevo_estado
+            self.estado = CATEGORIAS.canonico(nuevo_estado)
         else:
             raise ValueError(f"Estado invalido: {nuevo_estado}")
 
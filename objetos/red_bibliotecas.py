@@ -2,30 +2,113 @@ from objetos.biblioteca import Biblioteca
 from objetos.transferencia import Transferencia
 from objetos.libro import Libro
 from estructuras.grafo import Grafo
+from estructuras.tabla_rutas import TablaRutas
+from estructuras.jerarquia_contraccion import JerarquiaContraccion
 from objetos.inventario import Inventario
-from typing import Dict, List, Optional
+from objetos.reporte_carga import ReporteCarga
+from objetos import instantanea
+from objetos.bitacora import BitacoraOperaciones
+from estructuras.diccionario_categorias import CATEGORIAS
+from typing import Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 import csv
 import os
+import string
+import struct
+import time
 import unicodedata
 
+_RELLENO_CAMPO = string.whitespace + '"'
+
+
+# Estado de cada proceso trabajador de _cargar_libros_paralelo: libros ya validados
+# por biblioteca origen, acumulados bloque a bloque hasta armar su catalogo
+_LIBROS_TRABAJADOR: Dict[str, List[Libro]] = {}
+
+
+def _parsear_particion(tarea):
+    """Trabajador de _cargar_libros_paralelo: valida las filas de un origen en un bloque."""
+    origen, filas, numeros_fila, indices = tarea
+    reporte = ReporteCarga()
+    por_origen, solicitudes = RedBibliotecas._parsear_bloque_libros(filas, numeros_fila, indices, {origen}, reporte)
+    _LIBROS_TRABAJADOR.setdefault(origen, []).extend(por_origen.get(origen, []))
+    return reporte, solicitudes
+
+
+def _construir_catalogo(tarea):
+    """Trabajador de _cargar_libros_paralelo: arma el catalogo de una biblioteca con sus libros acumulados."""
+    origen, catalogo = tarea
+    libros = _LIBROS_TRABAJADOR.pop(origen, [])
+    
+    # Misma preparacion que Biblioteca.agregar_libros_catalogo; el inventario se actualiza al volver
+    biblioteca = Biblioteca(origen, origen, "")
+    biblioteca.catalogo_local = catalogo
+    biblioteca.agregar_libros_catalogo(libros, registrar_rollback=False, contar_ingreso=False, silencioso=True)
+    
+    por_genero: Dict[str, int] = {}
+    for libro in libros:
+        genero = libro.genero or "SinGenero"
+        por_genero[genero] = por_genero.get(genero, 0) + 1
+    return origen, catalogo, por_genero
+
+
 class RedBibliotecas:
     
     def __init__(self):
         self.grafo = Grafo()
+        self.tabla_rutas = TablaRutas(self.grafo)
+        # Indices opcionales de jerarquias de contraccion por criterio
+        self.jerarquias: Dict[str, JerarquiaContraccion] = {}
         self.bibliotecas: Dict[str, Biblioteca] = {}
-        self.transferencias_activas: List[Transferencia] = []
+        # Transferencias activas indexadas por ISBN (conservan el orden de inicio)
+        self.transferencias_por_isbn: Dict[str, Transferencia] = {}
+        # Transferencias que llegaron a "completado" y aun no se movieron al historial
+        self._por_finalizar: Dict[str, Transferencia] = {}
         self.transferencias_completadas: List[Transferencia] = []
         self.inventario_global = Inventario()
         self.ultima_ruta_calculada: Optional[List[str]] = None
+        # Algoritmo usado para planificar transferencias: "dijkstra" o "a_estrella"
+        self.algoritmo_rutas = "dijkstra"
+        self.ultimo_reporte_carga: Optional[ReporteCarga] = None
+        # Bitacora de operaciones y directorio donde vive junto a su instantanea
+        self.bitacora: Optional[BitacoraOperaciones] = None
+        self.directorio_bitacora: Optional[str] = None
+        self._secuencia_instantanea = 0
 
     # -------------------------------------------------
     # Utilidades internas
     # -------------------------------------------------
+    @property
+    def transferencias_activas(self) -> List[Transferencia]:
+        return list(self.transferencias_por_isbn.values())
+
     def _registrar_biblioteca(self, biblioteca: Biblioteca) -> None:
         biblioteca.set_inventario(self.inventario_global)
+        biblioteca.set_bitacora(self.bitacora)
+        self._registrar("biblioteca", id=biblioteca.id, nombre=biblioteca.nombre,
+                        ubicacion=biblioteca.ubicacion, tiempo_ingreso=biblioteca.tiempo_ingreso,
+                        tiempo_traspaso=biblioteca.tiempo_traspaso,
+                        intervalo_despacho=biblioteca.intervalo_despacho)
         self.bibliotecas[biblioteca.id] = biblioteca
         self.inventario_global.agregar_biblioteca(biblioteca.id)
         self.grafo.agregar_nodo(biblioteca.id, biblioteca.nombre)
+        coordenadas = self._parsear_coordenadas(biblioteca.ubicacion)
+        if coordenadas:
+            self.grafo.asignar_coordenadas(biblioteca.id, *coordenadas)
+
+    @staticmethod
+    def _parsear_coordenadas(ubicacion: str) -> Optional[Tuple[float, float]]:
+        # Acepta ubicaciones de la forma "latitud, longitud"; cualquier otro texto se ignora
+        partes = (ubicacion or "").split(",")
+        if len(partes) != 2:
+            return None
+        try:
+            return float(partes[0]), float(partes[1])
+        except ValueError:
+            return None
 
     @staticmethod
     def _normalizar_texto(texto: str) -> str:
@@ -120,13 +203,25 @@ class RedBibliotecas:
                         continue
                     
                     self.grafo.agregar_arista(origen, destino, tiempo, costo, bidireccional=True)
+                    self.tabla_rutas.arista_agregada(origen, destino, tiempo, costo, bidireccional=True)
+                    self._registrar("conexion", origen=origen, destino=destino, tiempo=tiempo,
+                                    costo=costo, bidireccional=True)
                     contador += 1
             return contador
         except Exception as error:
             print(f"Error al cargar conexiones: {error}")
             return 0
 
-    def cargar_libros_csv(self, ruta_archivo: str) -> int:
+    def cargar_libros_csv(self, ruta_archivo: str, tamanio_bloque: int = 10000, procesos: int = 1) -> int:
+        """
+        Carga libros en flujo, por bloques de `tamanio_bloque` filas: cada bloque se
+        valida por columnas, se inserta con una carga masiva por biblioteca origen y
+        luego programa sus transferencias en lote. La memoria usada depende del
+        tamanio del bloque y no del archivo. Los errores por fila quedan en
+        self.ultimo_reporte_carga en lugar de imprimirse.
+        Con procesos > 1 cada bloque se particiona por biblioteca origen y cada
+        catalogo se construye en un proceso aparte (ver _cargar_libros_paralelo).
+        """
         if not os.path.exists(ruta_archivo):
             print(f"Error: no se encontro el archivo {ruta_archivo}")
             return 0
@@ -135,7 +230,8 @@ class RedBibliotecas:
             print("No hay bibliotecas registradas. Cargue bibliotecas primero.")
             return 0
         
-        cargados = 0
+        reporte = ReporteCarga()
+        self.ultimo_reporte_carga = reporte
         try:
             with open(ruta_archivo, "r", encoding="utf-8") as archivo:
                 lector = csv.reader(archivo)
@@ -144,66 +240,200 @@ class RedBibliotecas:
                     print("Archivo de libros vacio.")
                     return 0
                 
-                mapa = self._mapear_columnas(encabezado)
-
-                idx_titulo = mapa.get("titulo", 0)
-                idx_isbn = mapa.get("isbn", 1)
-                idx_genero = mapa.get("genero", 2)
-                idx_autor = mapa.get("autor", 4)
-                idx_anio = mapa.get("anio", mapa.get("ano", 3))
-                idx_estado = mapa.get("estado", 5)
-                idx_origen = mapa.get("idbibliotecaorigen", mapa.get("bibliotecaorigen", 6))
-                idx_destino = mapa.get("idbibliotecadestino", mapa.get("bibliotecadestino", 7))
-                idx_prioridad = mapa.get("prioridad", 8)
-
-                for fila in lector:
-                    if not fila:
-                        continue
-                    
-                    try:
-                        titulo = self._leer_campo(fila, idx_titulo)
-                        isbn = self._leer_campo(fila, idx_isbn)
-                        genero = self._leer_campo(fila, idx_genero)
-                        autor = self._leer_campo(fila, idx_autor)
-                        anio = int(self._leer_campo(fila, idx_anio, "0") or 0)
-                        estado = self._leer_campo(fila, idx_estado, "disponible") or "disponible"
-                        origen = self._leer_campo(fila, idx_origen)
-                        destino = self._leer_campo(fila, idx_destino)
-                        prioridad = self._leer_campo(fila, idx_prioridad, "tiempo") or "tiempo"
-                        
-                        if not origen or origen not in self.bibliotecas:
-                            print(f"Libro '{titulo}' omitido: biblioteca origen invalida")
-                            continue
-                        
-                        libro = Libro(
-                            titulo=titulo,
-                            isbn=isbn,
-                            genero=genero,
-                            anio=anio,
-                            autor=autor,
-                            estado=estado.lower(),
-                            biblioteca_origen=origen,
-                            biblioteca_destino=destino,
-                            prioridad=prioridad.lower()
-                        )
-                        
-                        biblioteca = self.bibliotecas[origen]
-                        biblioteca.agregar_libro_catalogo(
-                            libro,
-                            registrar_rollback=False,
-                            contar_ingreso=False
-                        )
-                        cargados += 1
-                        
-                        if destino and destino != origen and libro.estado == "disponible":
-                            self.programar_transferencia(isbn, origen, destino, prioridad)
-                    except Exception as error:
-                        print(f"Error al cargar libro desde fila {fila}: {error}")
-                        continue
-            return cargados
+                indices = self._indices_columnas_libros(encabezado)
+                # Una carga masiva no se registra fila por fila: termina en una compactacion
+                with self._pausar_bitacora():
+                    if procesos > 1:
+                        self._cargar_libros_paralelo(lector, indices, procesos, tamanio_bloque, reporte)
+                    else:
+                        # La fila 1 es el encabezado
+                        for primera_fila, bloque in self._leer_en_bloques(lector, tamanio_bloque, 2):
+                            numeros_fila = range(primera_fila, primera_fila + len(bloque))
+                            por_origen, solicitudes = self._parsear_bloque_libros(
+                                bloque, numeros_fila, indices, self.bibliotecas, reporte)
+                            self._agregar_libros_por_origen(por_origen)
+                            self._programar_transferencias_carga(solicitudes, reporte)
+            if self.bitacora:
+                self.compactar_bitacora()
+            
+            if reporte.total_errores:
+                print(f"Carga de libros: {reporte.total_errores} filas con error (ver ultimo_reporte_carga)")
+            return reporte.cargados
         except Exception as error:
             print(f"Error al cargar libros: {error}")
-            return 0
+            return reporte.cargados
+
+    def _agregar_libros_por_origen(self, por_origen: Dict[str, List[Libro]]) -> None:
+        for origen, libros in por_origen.items():
+            self.bibliotecas[origen].agregar_libros_catalogo(
+                libros,
+                registrar_rollback=False,
+                contar_ingreso=False,
+                silencioso=True
+            )
+
+    def _cargar_libros_paralelo(self, lector, indices: Tuple[int, ...], procesos: int,
+                                tamanio_bloque: int, reporte: ReporteCarga) -> None:
+        """
+        Lee el archivo por bloques como la carga secuencial y reparte cada bloque por
+        biblioteca origen. Cada origen queda fijo en uno de `procesos` procesos, que
+        valida sus filas y acumula los libros; al final del archivo ese proceso arma
+        el catalogo, que vuelve serializado y se instala en su biblioteca. Hay a lo
+        sumo 2 * procesos particiones en vuelo, asi que la memoria del proceso
+        principal depende del tamanio del bloque y no del archivo. Las transferencias
+        pedidas se programan al final en lote, cuando los libros ya estan en sus
+        catalogos. Solo se delegan bibliotecas con catalogo vacio; el resto se carga aqui.
+        """
+        indice_origen = indices[6]
+        delegables = {origen for origen, biblioteca in self.bibliotecas.items()
+                      if not biblioteca.catalogo_local.lista_secuencial.tamanio}
+        # Un ejecutor de un solo proceso por lugar: los bloques de un origen siempre van al mismo
+        ejecutores = [ProcessPoolExecutor(max_workers=1) for _ in range(procesos)]
+        lugar_por_origen: Dict[str, int] = {}
+        en_vuelo = deque()
+        solicitudes: List[Tuple[str, str, str, str, int]] = []
+        
+        def recoger(futuro) -> None:
+            parcial, propias = futuro.result()
+            reporte.combinar(parcial)
+            solicitudes.extend(propias)
+        
+        try:
+            for primera_fila, bloque in self._leer_en_bloques(lector, tamanio_bloque, 2):
+                particiones: Dict[str, Tuple[List[List[str]], List[int]]] = {}
+                for numero_fila, fila in enumerate(bloque, start=primera_fila):
+                    origen = fila[indice_origen].strip(_RELLENO_CAMPO) if indice_origen < len(fila) else ""
+                    particion = particiones.get(origen)
+                    if particion is None:
+                        particion = particiones[origen] = ([], [])
+                    particion[0].append(fila)
+                    particion[1].append(numero_fila)
+                
+                for origen, (filas, numeros_fila) in particiones.items():
+                    if origen in delegables:
+                        lugar = lugar_por_origen.setdefault(origen, len(lugar_por_origen) % procesos)
+                        en_vuelo.append(ejecutores[lugar].submit(
+                            _parsear_particion, (origen, filas, numeros_fila, indices)))
+                    else:
+                        por_origen, propias = self._parsear_bloque_libros(
+                            filas, numeros_fila, indices, self.bibliotecas, reporte)
+                        self._agregar_libros_por_origen(por_origen)
+                        solicitudes.extend(propias)
+                
+                while len(en_vuelo) > 2 * procesos:
+                    recoger(en_vuelo.popleft())
+            while en_vuelo:
+                recoger(en_vuelo.popleft())
+            
+            catalogos = [ejecutores[lugar].submit(_construir_catalogo, (origen, self.bibliotecas[origen].catalogo_local))
+                         for origen, lugar in lugar_por_origen.items()]
+            for futuro in catalogos:
+                origen, catalogo, por_genero = futuro.result()
+                self.bibliotecas[origen].catalogo_local = catalogo
+                for genero, cantidad in por_genero.items():
+                    self.inventario_global.incrementar(origen, genero, cantidad)
+        finally:
+            for ejecutor in ejecutores:
+                ejecutor.shutdown()
+        
+        self._programar_transferencias_carga(solicitudes, reporte)
+
+    def _programar_transferencias_carga(self, solicitudes: List[Tuple[str, str, str, str, int]],
+                                        reporte: ReporteCarga) -> None:
+        """Programa las transferencias de una carga; los fallos quedan en el reporte con su fila."""
+        motivos = self._programar_transferencias_lote([solicitud[:4] for solicitud in solicitudes])
+        for solicitud, motivo in zip(solicitudes, motivos):
+            if motivo:
+                reporte.agregar_error(solicitud[4], motivo)
+            else:
+                reporte.transferencias += 1
+
+    @classmethod
+    def _indices_columnas_libros(cls, encabezado: List[str]) -> Tuple[int, ...]:
+        mapa = cls._mapear_columnas(encabezado)
+        return (
+            mapa.get("titulo", 0),
+            mapa.get("isbn", 1),
+            mapa.get("genero", 2),
+            mapa.get("anio", mapa.get("ano", 3)),
+            mapa.get("autor", 4),
+            mapa.get("estado", 5),
+            mapa.get("idbibliotecaorigen", mapa.get("bibliotecaorigen", 6)),
+            mapa.get("idbibliotecadestino", mapa.get("bibliotecadestino", 7)),
+            mapa.get("prioridad", 8),
+        )
+
+    @staticmethod
+    def _leer_en_bloques(lector, tamanio_bloque: int, primera_fila: int = 1):
+        """Genera (numero de la primera fila, filas) sin leer mas de un bloque a la vez."""
+        numero = primera_fila
+        while True:
+            bloque = list(islice(lector, tamanio_bloque))
+            if not bloque:
+                return
+            yield numero, bloque
+            numero += len(bloque)
+
+    @staticmethod
+    def _columna(bloque: List[List[str]], indice: int) -> List[str]:
+        # Un solo strip por campo: espacios y comillas de los extremos
+        return [fila[indice].strip(_RELLENO_CAMPO) if indice < len(fila) else "" for fila in bloque]
+
+    @classmethod
+    def _parsear_bloque_libros(cls, bloque: List[List[str]], numeros_fila, indices: Tuple[int, ...],
+                               origenes_validos, reporte: ReporteCarga
+                               ) -> Tuple[Dict[str, List[Libro]], List[Tuple[str, str, str, str, int]]]:
+        """
+        Valida un bloque columna por columna y agrupa los libros por biblioteca origen.
+        Las transferencias pedidas salen como (isbn, origen, destino, prioridad, fila).
+        """
+        titulos, isbns, generos, anios, autores, estados, origenes, destinos, prioridades = (
+            cls._columna(bloque, indice) for indice in indices
+        )
+        # Columnas categoricas: normalizadas una vez por valor distinto y compartidas
+        generos = CATEGORIAS.canonicos(generos)
+        estados = CATEGORIAS.canonicos(estados, lambda valor: (valor or "disponible").lower())
+        origenes = CATEGORIAS.canonicos(origenes)
+        destinos = CATEGORIAS.canonicos(destinos)
+        prioridades = CATEGORIAS.canonicos(prioridades, lambda valor: (valor or "tiempo").lower())
+        
+        por_origen: Dict[str, List[Libro]] = {}
+        solicitudes: List[Tuple[str, str, str, str, int]] = []
+        for i, (fila, numero_fila) in enumerate(zip(bloque, numeros_fila)):
+            if not fila:
+                continue
+            reporte.filas_leidas += 1
+            
+            origen = origenes[i]
+            if origen not in origenes_validos:
+                reporte.agregar_error(numero_fila, f"Libro '{titulos[i]}' omitido: biblioteca origen invalida")
+                continue
+            
+            try:
+                anio = int(anios[i] or 0)
+                libro = Libro(
+                    titulo=titulos[i],
+                    isbn=isbns[i],
+                    genero=generos[i],
+                    anio=anio,
+                    autor=autores[i],
+                    estado=estados[i],
+                    biblioteca_origen=origen,
+                    biblioteca_destino=destinos[i],
+                    prioridad=prioridades[i]
+                )
+            except Exception as error:
+                # Cualquier fila mal formada queda en el reporte; la carga sigue
+                reporte.agregar_error(numero_fila, str(error))
+                continue
+            
+            por_origen.setdefault(origen, []).append(libro)
+            reporte.cargados += 1
+            
+            destino = destinos[i]
+            if destino and destino != origen:
+                solicitudes.append((libro.isbn, origen, destino, libro.prioridad, numero_fila))
+        return por_origen, solicitudes
 
     # -------------------------------------------------
     # Gestion de bibliotecas y conexiones manuales
@@ -222,13 +452,177 @@ class RedBibliotecas:
         self._registrar_biblioteca(biblioteca)
         print(f"Biblioteca '{nombre}' agregada con ID '{id_bib}'")
     
+    def asignar_coordenadas(self, id_biblioteca: str, latitud: float, longitud: float) -> bool:
+        if id_biblioteca not in self.bibliotecas:
+            return False
+        self.grafo.asignar_coordenadas(id_biblioteca, latitud, longitud)
+        self._registrar("coordenadas", biblioteca=id_biblioteca, latitud=latitud, longitud=longitud)
+        return True
+
     def agregar_conexion(self, origen: str, destino: str, tiempo: int, costo: float, bidireccional: bool = True) -> bool:
         if origen not in self.bibliotecas or destino not in self.bibliotecas:
             print("No es posible crear la conexion: uno de los nodos no existe.")
             return False
         self.grafo.agregar_arista(origen, destino, tiempo, costo, bidireccional)
+        self.tabla_rutas.arista_agregada(origen, destino, tiempo, costo, bidireccional)
+        self._registrar("conexion", origen=origen, destino=destino, tiempo=tiempo,
+                        costo=costo, bidireccional=bidireccional)
         return True
 
+    def precalcular_rutas(self, procesos: int = 1) -> None:
+        self.tabla_rutas.construir(procesos)
+
+    # -------------------------------------------------
+    # Jerarquias de contraccion
+    # -------------------------------------------------
+    def construir_jerarquias(self) -> None:
+        for criterio in ("tiempo", "costo"):
+            self.jerarquias[criterio] = JerarquiaContraccion(criterio).construir(self.grafo)
+
+    def _obtener_jerarquia(self, criterio: str) -> JerarquiaContraccion:
+        jerarquia = self.jerarquias.get(criterio)
+        if jerarquia is None or not jerarquia.vigente(self.grafo):
+            jerarquia = JerarquiaContraccion(criterio).construir(self.grafo)
+            self.jerarquias[criterio] = jerarquia
+        return jerarquia
+
+    def guardar_jerarquias(self, directorio: str = "datos") -> None:
+        os.makedirs(directorio, exist_ok=True)
+        for criterio in ("tiempo", "costo"):
+            self._obtener_jerarquia(criterio).guardar(os.path.join(directorio, f"jerarquia_{criterio}.json"))
+
+    def cargar_jerarquias(self, directorio: str = "datos") -> int:
+        cargadas = 0
+        for criterio in ("tiempo", "costo"):
+            jerarquia = JerarquiaContraccion.cargar(os.path.join(directorio, f"jerarquia_{criterio}.json"))
+            # Un indice guardado para otra topologia se descarta
+            if jerarquia and jerarquia.criterio == criterio and jerarquia.vigente(self.grafo):
+                self.jerarquias[criterio] = jerarquia
+                cargadas += 1
+        return cargadas
+
+    # -------------------------------------------------
+    # Instantaneas
+    # -------------------------------------------------
+    def guardar_instantanea(self, ruta_archivo: str) -> None:
+        directorio = os.path.dirname(ruta_archivo)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        instantanea.guardar(self, ruta_archivo, self.bitacora.secuencia if self.bitacora else 0)
+        print(f"Instantanea guardada en {ruta_archivo}")
+
+    def cargar_instantanea(self, ruta_archivo: str) -> bool:
+        if self.bibliotecas or self.grafo.nodos:
+            print("La instantanea solo se puede cargar en una red vacia.")
+            return False
+        if not os.path.exists(ruta_archivo):
+            print(f"No existe la instantanea {ruta_archivo}")
+            return False
+        try:
+            self._secuencia_instantanea = instantanea.cargar(self, ruta_archivo)
+        except (ValueError, KeyError, struct.error) as e:
+            print(f"Error cargando instantanea: {e}")
+            return False
+        print(f"Instantanea cargada: {len(self.bibliotecas)} bibliotecas, "
+              f"{len(self.transferencias_por_isbn)} transferencias activas")
+        return True
+
+    # -------------------------------------------------
+    # Bitacora de operaciones
+    # -------------------------------------------------
+    def _registrar(self, operacion: str, **datos) -> None:
+        if self.bitacora:
+            self.bitacora.registrar(operacion, **datos)
+
+    def _pausar_bitacora(self):
+        return self.bitacora.pausar() if self.bitacora else nullcontext()
+
+    def activar_bitacora(self, directorio: str, **opciones) -> int:
+        """
+        Recupera el estado de `directorio` (instantanea + operaciones posteriores) y
+        empieza a registrar cada cambio. Si la red ya tiene datos, estos pasan a ser
+        la nueva instantanea. Retorna cuantas operaciones se repitieron.
+        """
+        if self.bitacora:
+            print("La bitacora ya esta activa.")
+            return 0
+        directorio = os.path.abspath(os.path.expanduser(directorio))
+        os.makedirs(directorio, exist_ok=True)
+        ruta_instantanea = os.path.join(directorio, "red.bin")
+        ruta_bitacora = os.path.join(directorio, "operaciones.log")
+        self.directorio_bitacora = directorio
+
+        if self.bibliotecas:
+            self.bitacora = BitacoraOperaciones(ruta_bitacora, **opciones)
+            self._conectar_bitacora()
+            self.compactar_bitacora()
+            return 0
+
+        self._secuencia_instantanea = 0
+        if os.path.exists(ruta_instantanea) and not self.cargar_instantanea(ruta_instantanea):
+            print("No se pudo recuperar la instantanea; la bitacora queda sin activar.")
+            return 0
+        repetidas = 0
+        registros, descartadas = BitacoraOperaciones.leer(ruta_bitacora)
+        if descartadas:
+            print(f"Bitacora: {descartadas} lineas incompletas o danadas al final, se descartan")
+        for registro in registros:
+            if registro["seq"] > self._secuencia_instantanea:
+                self._aplicar_operacion(registro)
+                repetidas += 1
+        # La historia de deshacer empieza de nuevo, igual que al cargar una instantanea
+        for biblioteca in self.bibliotecas.values():
+            biblioteca.pila_rollback.limpiar()
+            biblioteca.catalogo_local.pila_operaciones.limpiar()
+
+        self.bitacora = BitacoraOperaciones(ruta_bitacora, self._secuencia_instantanea, **opciones)
+        self._conectar_bitacora()
+        if repetidas:
+            print(f"Bitacora: {repetidas} operaciones recuperadas")
+        return repetidas
+
+    def _conectar_bitacora(self) -> None:
+        for biblioteca in self.bibliotecas.values():
+            biblioteca.set_bitacora(self.bitacora)
+
+    def compactar_bitacora(self) -> None:
+        """Guarda una instantanea con todo lo aplicado y vacia la bitacora."""
+        if not self.bitacora:
+            return
+        self.bitacora.sincronizar()
+        self.guardar_instantanea(os.path.join(self.directorio_bitacora, "red.bin"))
+        self.bitacora.truncar()
+
+    def cerrar_bitacora(self) -> None:
+        if not self.bitacora:
+            return
+        self.bitacora.cerrar()
+        self.bitacora = None
+        self._conectar_bitacora()
+
+    def _aplicar_operacion(self, registro: dict) -> None:
+        operacion = registro["op"]
+        if operacion == "biblioteca":
+            self._registrar_biblioteca(Biblioteca(
+                registro["id"], registro["nombre"], registro["ubicacion"], registro["tiempo_ingreso"],
+                registro["tiempo_traspaso"], registro["intervalo_despacho"], self.inventario_global))
+        elif operacion == "conexion":
+            self.agregar_conexion(registro["origen"], registro["destino"], registro["tiempo"],
+                                  registro["costo"], registro["bidireccional"])
+        elif operacion == "coordenadas":
+            self.asignar_coordenadas(registro["biblioteca"], registro["latitud"], registro["longitud"])
+        elif operacion == "transferencia":
+            self._programar_transferencia(registro["isbn"], registro["origen"], registro["destino"],
+                                          registro["prioridad"])
+        elif operacion == "tick":
+            # Se fuerza el mismo despacho que hubo: los demas esperan su intervalo
+            ahora = time.time()
+            for biblioteca in self.bibliotecas.values():
+                biblioteca.ultimo_despacho = 0 if biblioteca.id in registro["despachos"] else ahora
+            self.simular_tick()
+        else:
+            self.bibliotecas[registro["biblioteca"]].aplicar_operacion(registro)
+
     # -------------------------------------------------
     # Transferencias
     # -------------------------------------------------
@@ -236,47 +630,81 @@ class RedBibliotecas:
         return self.iniciar_transferencia(isbn, origen, destino, prioridad)
 
     def iniciar_transferencia(self, isbn: str, origen: str, destino: str, prioridad: str = "tiempo") -> bool:
-        if origen not in self.bibliotecas:
-            print(f"Biblioteca origen '{origen}' no existe.")
+        motivo = self._programar_transferencia(isbn, origen, destino, prioridad)
+        if motivo:
+            print(motivo)
             return False
         
+        libro = self.transferencias_por_isbn[isbn].libro
+        print(f"Transferencia programada: {libro.titulo} ({isbn}) {origen} -> {destino}")
+        return True
+
+    def _programar_transferencia(self, isbn: str, origen: str, destino: str, prioridad: str = "tiempo") -> Optional[str]:
+        """Programa la transferencia sin imprimir nada. Retorna None o el motivo por el que no se pudo."""
+        if origen not in self.bibliotecas:
+            return f"Biblioteca origen '{origen}' no existe."
+        
         if destino not in self.bibliotecas:
-            print(f"Biblioteca destino '{destino}' no existe.")
-            return False
+            return f"Biblioteca destino '{destino}' no existe."
         
         if origen == destino:
-            print("La biblioteca origen y destino son iguales.")
-            return False
+            return "La biblioteca origen y destino son iguales."
         
-        for trans in self.transferencias_activas:
-            if trans.libro.isbn == isbn and trans.estado in ("pendiente", "planificado", "en_transito"):
-                print(f"El libro con ISBN {isbn} ya tiene una transferencia activa.")
-                return False
+        activa = self.transferencias_por_isbn.get(isbn)
+        if activa and activa.estado in ("pendiente", "planificado", "en_transito"):
+            return f"El libro con ISBN {isbn} ya tiene una transferencia activa."
         
         biblioteca_origen = self.bibliotecas[origen]
         libro = biblioteca_origen.obtener_libro_por_isbn(isbn)
         
         if not libro:
-            print(f"Libro con ISBN '{isbn}' no encontrado en {origen}.")
-            return False
+            return f"Libro con ISBN '{isbn}' no encontrado en {origen}."
         
         if libro.estado != "disponible":
-            print(f"Libro '{libro.titulo}' no esta disponible (estado: {libro.estado}).")
-            return False
+            return f"Libro '{libro.titulo}' no esta disponible (estado: {libro.estado})."
         
         transferencia = Transferencia(libro, origen, destino, prioridad)
-        if not transferencia.calcular_ruta(self.grafo):
-            print("No se encontro ruta para la transferencia.")
-            return False
+        if not transferencia.calcular_ruta(self.grafo, self.tabla_rutas, self.algoritmo_rutas):
+            return "No se encontro ruta para la transferencia."
         
         transferencia.iniciar_envio()
         libro.biblioteca_destino = destino
-        biblioteca_origen.eliminar_libro_catalogo(isbn)
+        with self._pausar_bitacora():
+            biblioteca_origen.eliminar_libro_catalogo(isbn, silencioso=True)
         biblioteca_origen.cola_salida.encolar(libro)
-        self.transferencias_activas.append(transferencia)
+        self.transferencias_por_isbn[isbn] = transferencia
+        self._registrar("transferencia", isbn=isbn, origen=origen, destino=destino, prioridad=prioridad)
+        return None
+
+    def iniciar_transferencias_lote(self, solicitudes: List[Tuple[str, str, str, str]]) -> List[bool]:
+        """
+        Programa varias transferencias (isbn, origen, destino, prioridad) de una vez.
+        Las solicitudes se agrupan por origen para que cada grupo lea el mismo arbol
+        de caminos minimos. Retorna el resultado de cada solicitud en el mismo orden.
+        """
+        resultados = []
+        for (isbn, origen, destino, _), motivo in zip(solicitudes, self._programar_transferencias_lote(solicitudes)):
+            if motivo:
+                print(motivo)
+            else:
+                print(f"Transferencia programada: {isbn} {origen} -> {destino}")
+            resultados.append(motivo is None)
+        return resultados
+
+    def _programar_transferencias_lote(self, solicitudes: List[Tuple[str, str, str, str]]) -> List[Optional[str]]:
+        """Version silenciosa de iniciar_transferencias_lote: el motivo de cada fallo o None."""
+        motivos: List[Optional[str]] = [None] * len(solicitudes)
+        grupos: Dict[str, List[int]] = {}
+        for i, solicitud in enumerate(solicitudes):
+            grupos.setdefault(solicitud[1], []).append(i)
         
-        print(f"Transferencia programada: {libro.titulo} ({isbn}) {origen} -> {destino}")
-        return True
+        for origen, indices in grupos.items():
+            # Un solo arbol por origen y criterio para todo el grupo
+            self.tabla_rutas.preparar(origen)
+            for i in indices:
+                isbn, _, destino, prioridad = solicitudes[i]
+                motivos[i] = self._programar_transferencia(isbn, origen, destino, prioridad)
+        return motivos
 
     def solicitar_transferencia(self, libro: Libro, id_origen: str, id_destino: str, criterio: str = "tiempo") -> bool:
         if id_origen not in self.bibliotecas or id_destino not in self.bibliotecas:
@@ -294,27 +722,34 @@ class RedBibliotecas:
     # -------------------------------------------------
     def simular_tick(self) -> None:
         despachados: List[Libro] = []
-        for biblioteca in self.bibliotecas.values():
-            biblioteca.procesar_ingreso()
-            biblioteca.procesar_traspaso()
-            libro = biblioteca.procesar_salida()
-            if libro:
-                despachados.append(libro)
-        
-        for libro in despachados:
-            self._mover_libro_en_transito(libro)
+        origenes_despacho: List[str] = []
+        hubo_cambios = False
+        with self._pausar_bitacora():
+            for biblioteca in self.bibliotecas.values():
+                hubo_cambios |= biblioteca.procesar_ingreso()
+                hubo_cambios |= biblioteca.procesar_traspaso()
+                libro = biblioteca.procesar_salida()
+                if libro:
+                    despachados.append(libro)
+                    origenes_despacho.append(biblioteca.id)
+            
+            for libro in despachados:
+                self._mover_libro_en_transito(libro)
         
-        finalizadas = [trans for trans in self.transferencias_activas if trans.estado == "completado"]
-        for trans in finalizadas:
-            self.transferencias_activas.remove(trans)
+        for isbn, trans in self._por_finalizar.items():
             self.transferencias_completadas.append(trans)
+            if self.transferencias_por_isbn.get(isbn) is trans:
+                del self.transferencias_por_isbn[isbn]
+        self._por_finalizar.clear()
+        
+        # Solo el despacho depende del reloj: se guarda quien despacho para repetir el tick igual
+        if hubo_cambios or despachados:
+            self._registrar("tick", despachos=origenes_despacho)
+            if self.bitacora and self.bitacora.necesita_compactar():
+                self.compactar_bitacora()
 
     def _mover_libro_en_transito(self, libro: Libro) -> None:
-        trans_encontrada = None
-        for trans in self.transferencias_activas:
-            if trans.libro.isbn == libro.isbn:
-                trans_encontrada = trans
-                break
+        trans_encontrada = self.transferencias_por_isbn.get(libro.isbn)
         
         if trans_encontrada:
             siguiente = trans_encontrada.avanzar_paso()
@@ -323,6 +758,8 @@ class RedBibliotecas:
             else:
                 destino = trans_encontrada.destino
                 self.bibliotecas[destino].agregar_libro_ingreso(libro)
+            if trans_encontrada.estado == "completado":
+                self._por_finalizar[libro.isbn] = trans_encontrada
         else:
             print(f"Advertencia: Libro {libro.isbn} despachado sin transferencia activa.")
 
@@ -331,11 +768,13 @@ class RedBibliotecas:
     # Consultas y reportes
     # -------------------------------------------------
     
-    def calcular_ruta_optima(self, origen: str, destino: str, criterio: str = "tiempo"):
-        if criterio == "tiempo":
-            distancia, ruta = self.grafo.dijkstra_tiempo(origen, destino)
+    def calcular_ruta_optima(self, origen: str, destino: str, criterio: str = "tiempo", algoritmo: str = "dijkstra"):
+        if algoritmo == "a_estrella":
+            distancia, ruta = self.grafo.a_estrella(origen, destino, criterio)
+        elif algoritmo == "jerarquia":
+            distancia, ruta = self._obtener_jerarquia(criterio).ruta(origen, destino)
         else:
-            distancia, ruta = self.grafo.dijkstra_costo(origen, destino)
+            distancia, ruta = self.tabla_rutas.consultar(origen, destino, criterio)
         
         self.ultima_ruta_calculada = ruta if ruta else None
         
@@ -360,12 +799,12 @@ class RedBibliotecas:
 
     def listar_transferencias_activas(self) -> None:
         print("\n" + "=" * 80)
-        print(f"TRANSFERENCIAS ACTIVAS ({len(self.transferencias_activas)})")
+        print(f"TRANSFERENCIAS ACTIVAS ({len(self.transferencias_por_isbn)})")
         print("=" * 80)
-        if not self.transferencias_activas:
+        if not self.transferencias_por_isbn:
             print("No hay transferencias activas.")
         else:
-            for trans in self.transferencias_activas:
+            for trans in self.transferencias_por_isbn.values():
                 progreso = int(trans.obtener_progreso() * 100)
                 restante = trans.obtener_tiempo_restante()
                 ruta = " -> ".join(trans.ruta)
@@ -394,7 +833,7 @@ class RedBibliotecas:
             "total_conexiones": graf_stats.get("aristas", 0),
             "total_libros_catalogados": total_libros,
             "total_en_transito": total_en_transito,
-            "transferencias_activas": len(self.transferencias_activas),
+            "transferencias_activas": len(self.transferencias_por_isbn),
             "transferencias_completadas": len(self.transferencias_completadas)
         }
 
@@ -0,0 +1,44 @@
+from typing import List, Tuple
+
+
+class ReporteCarga:
+    """
+    Resultado de una carga masiva de libros: contadores y los errores por fila.
+    Solo se guardan los primeros `limite_errores` mensajes para que la memoria no
+    crezca con el tamanio del archivo; el total siempre se cuenta.
+    """
+
+    def __init__(self, limite_errores: int = 1000):
+        self.filas_leidas = 0
+        self.cargados = 0
+        self.transferencias = 0
+        self.total_errores = 0
+        self.limite_errores = limite_errores
+        self.errores: List[Tuple[int, str]] = []
+
+    def agregar_error(self, numero_fila: int, mensaje: str) -> None:
+        self.total_errores += 1
+        if len(self.errores) < self.limite_errores:
+            self.errores.append((numero_fila, mensaje))
+
+    def combinar(self, otro: "ReporteCarga") -> None:
+        """Suma a este reporte el de una carga parcial (por ejemplo, de otro proceso)."""
+        self.filas_leidas += otro.filas_leidas
+        self.cargados += otro.cargados
+        self.transferencias += otro.transferencias
+        for numero_fila, mensaje in otro.errores:
+            self.agregar_error(numero_fila, mensaje)
+        self.total_errores += otro.total_errores - len(otro.errores)
+
+    def mostrar(self) -> None:
+        print("\nREPORTE DE CARGA")
+        print("=" * 50)
+        print(f"Filas leidas:              {self.filas_leidas}")
+        print(f"Libros cargados:           {self.cargados}")
+        print(f"Transferencias programadas: {self.transferencias}")
+        print(f"Filas con error:           {self.total_errores}")
+        for numero_fila, mensaje in self.errores:
+            print(f"  Fila {numero_fila}: {mensaje}")
+        if self.total_errores > len(self.errores):
+            print(f"  ... y {self.total_errores - len(self.errores)} errores mas")
+        print("=" * 50)
@@ -1,5 +1,6 @@
 from objetos.libro import Libro
 from estructuras.grafo import Grafo
+from estructuras.tabla_rutas import TablaRutas
 from typing import List, Optional, Dict
 
 
@@ -25,12 +26,27 @@ class Transferencia:
         self.costo_total = 0.0
         self.costo_recorrido = 0.0
 
-    def calcular_ruta(self, grafo: Grafo) -> bool:
+    def calcular_ruta(self, grafo: Grafo, tabla_rutas: Optional[TablaRutas] = None,
+                      algoritmo: str = "dijkstra") -> bool:
         """
         Calcula la ruta optima segun la prioridad.
+        Con algoritmo="a_estrella" usa A* sobre el grafo; si no, y se recibe una
+        tabla de rutas, se consulta en ella (fila precalculada o Dijkstra bidireccional).
         Retorna True si encontro ruta valida.
         """
-        if self.prioridad == "costo" and hasattr(grafo, "dijkstra_costo"):
+        if algoritmo == "a_estrella" or tabla_rutas is not None:
+            criterio = "costo" if self.prioridad == "costo" else "tiempo"
+            if algoritmo == "a_estrella":
+                peso, ruta = grafo.a_estrella(self.origen, self.destino, criterio)
+            else:
+                peso, ruta = tabla_rutas.consultar(self.origen, self.destino, criterio)
+            if criterio == "costo":
+                costo = peso
+                tiempo = grafo.calcular_tiempo_ruta(ruta) if ruta else 0
+            else:
+                tiempo = peso
+                costo = grafo.calcular_costo_ruta(ruta) if ruta else 0
+        elif self.prioridad == "costo" and hasattr(grafo, "dijkstra_costo"):
             costo, ruta = grafo.dijkstra_costo(self.origen, self.destino)
             tiempo = grafo.calcular_tiempo_ruta(ruta) if ruta else 0
         else: